@@ -8,6 +8,7 @@ from datetime import datetime
 from flask import Flask, render_template, request
 from flask_socketio import SocketIO, emit, disconnect
 from dotenv import load_dotenv
+import orjson
 
 from services.websocket_handler import WebSocketHandler
 from services.broadcast_manager import SocketIOBroadcastAdapter
@@ -30,13 +31,27 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
 
-# 创建SocketIO实例
+class _OrjsonWrapper:
+    """orjson适配器：为SocketIO提供stdlib json兼容的dumps/loads接口"""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        # socketio会传入separators等stdlib参数，orjson不需要
+        return orjson.dumps(obj).decode()
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
+
+# 创建SocketIO实例（出站payload用orjson序列化，C实现且原生支持datetime）
 socketio = SocketIO(
-    app, 
+    app,
     cors_allowed_origins="*",
     logger=False,
     engineio_logger=False,
-    async_mode='threading'
+    async_mode='threading',
+    json=_OrjsonWrapper
 )
 
 # 创建WebSocket处理器和广播适配器
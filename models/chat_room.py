@@ -88,6 +88,11 @@ class ChatRoomState:
                     return True
             return False
     
+    def get_taken_usernames_set(self) -> set:
+        """获取当前在线用户名集合（用于批量占用检查）"""
+        with self._lock:
+            return {user.username for user in self.online_users.values()}
+
     def get_online_users(self) -> List[Dict[str, Any]]:
         """获取在线用户列表（公开信息）"""
         with self._lock:
@@ -459,7 +459,6 @@ class MockAIClient(AIClient):
     
     def get_ai_response(self, message: str, context: List[Dict[str, str]] = None, username: str = "用户") -> Tuple[bool, str]:
         """模拟AI回复"""
-        import time
         time.sleep(0.1)  # 模拟网络延迟
         
         self.stats['total_requests'] += 1
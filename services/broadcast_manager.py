@@ -37,7 +37,8 @@ class BroadcastManager:
         """初始化广播管理器"""
         self._subscribers = defaultdict(set)  # 事件类型 -> 订阅者集合
         self._socket_subscribers = {}  # socket_id -> 订阅者信息
-        self._room_subscribers = defaultdict(set)  # 房间 -> socket_id集合
+        self._room_subscribers = defaultdict(list)  # 房间 -> socket_id紧凑列表（顺序遍历扇出）
+        self._room_pos = {}  # socket_id -> 在房间列表中的位置（swap-pop O(1)移除）
         self._user_sockets = {}  # username -> socket_id
         self._socket_users = {}  # socket_id -> username
         
@@ -87,14 +88,17 @@ class BroadcastManager:
                     'last_activity': datetime.now()
                 }
                 
+                # 先取旧房间，再覆盖订阅者信息（覆盖后就读不到了）
+                prev_info = self._socket_subscribers.get(socket_id)
+                old_room = prev_info['room'] if prev_info else None
                 self._socket_subscribers[socket_id] = subscriber_info
-                
+
                 # 添加到事件订阅
                 for event_type in event_types:
                     self._subscribers[event_type].add(socket_id)
-                
-                # 添加到房间订阅
-                self._room_subscribers[room].add(socket_id)
+
+                # 添加到房间订阅（紧凑列表 + 位置索引）
+                self._add_room_member(room, socket_id, old_room)
                 
                 # 记录用户-Socket映射
                 if username:
@@ -131,9 +135,9 @@ class BroadcastManager:
                 for event_type in subscriber_info['event_types']:
                     self._subscribers[event_type].discard(socket_id)
                 
-                # 从房间订阅中移除
+                # 从房间订阅中移除（swap-pop保持列表紧凑）
                 room = subscriber_info['room']
-                self._room_subscribers[room].discard(socket_id)
+                self._remove_room_member(room, socket_id)
                 
                 # 清理用户-Socket映射
                 username = subscriber_info.get('username')
@@ -153,32 +157,65 @@ class BroadcastManager:
             logger.error(f"取消订阅失败: {e}")
             return False
     
-    def broadcast_message(self, message: Message, ai_response: Message = None, 
-                         room: str = "main", exclude_sockets: Set[str] = None) -> Dict[str, Any]:
+    def _add_room_member(self, room: str, socket_id: str, old_room: str = None) -> None:
+        """将Socket加入房间成员列表（已在房间则先移出旧房间）
+
+        old_room由调用方在覆盖订阅者信息前取出并显式传入
+        """
+        if socket_id in self._room_pos:
+            if old_room == room:
+                return
+            self._remove_room_member(old_room, socket_id)
+        members = self._room_subscribers[room]
+        self._room_pos[socket_id] = len(members)
+        members.append(socket_id)
+
+    def _remove_room_member(self, room: str, socket_id: str) -> None:
+        """从房间成员列表移除Socket（末尾元素换位填充，O(1)）"""
+        pos = self._room_pos.pop(socket_id, None)
+        if pos is None:
+            return
+        members = self._room_subscribers.get(room)
+        if not members:
+            return
+        last = members.pop()
+        if last != socket_id:
+            members[pos] = last
+            self._room_pos[last] = pos
+
+    def broadcast_message(self, message: Message, ai_response: Message = None,
+                         room: str = "main", exclude_sockets: Set[str] = None,
+                         message_data: Dict[str, Any] = None,
+                         ai_response_data: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         广播新消息
-        
+
         Args:
             message: 消息对象
             ai_response: AI回复消息（可选）
             room: 目标房间
             exclude_sockets: 排除的Socket ID集合
-            
+            message_data: 预先格式化的消息数据（可选，避免重复序列化）
+            ai_response_data: 预先格式化的AI回复数据（可选）
+
         Returns:
             广播结果
         """
         broadcast_type = BroadcastType.MESSAGE_WITH_AI_RESPONSE if ai_response else BroadcastType.NEW_MESSAGE
-        
+
         broadcast_data = {
             'type': broadcast_type.value,
-            'message': message.format_for_display(),
+            'message': message_data if message_data is not None else message.format_for_display(),
             'timestamp': datetime.now().isoformat(),
             'room': room
         }
-        
+
         if ai_response:
-            broadcast_data['ai_response'] = ai_response.format_for_display()
-        
+            broadcast_data['ai_response'] = (
+                ai_response_data if ai_response_data is not None
+                else ai_response.format_for_display()
+            )
+
         return self._broadcast(broadcast_type, broadcast_data, room, exclude_sockets)
     
     def broadcast_user_join(self, username: str, user_info: Dict[str, Any], 
@@ -229,7 +266,31 @@ class BroadcastManager:
         
         return self._broadcast(BroadcastType.USER_LEAVE, broadcast_data, room)
     
-    def broadcast_user_list_update(self, users: List[Dict[str, Any]], user_count: int, 
+    def broadcast_user_leave_batch(self, users_info: List[Dict[str, Any]],
+                                   room: str = "main") -> Dict[str, Any]:
+        """
+        批量广播用户离开通知（一次广播携带整批离开用户）
+
+        Args:
+            users_info: 离开用户的信息列表
+            room: 房间名称
+
+        Returns:
+            广播结果
+        """
+        usernames = [info.get('username') for info in users_info]
+        broadcast_data = {
+            'type': BroadcastType.USER_LEAVE.value,
+            'usernames': usernames,
+            'users_info': users_info,
+            'message': f"{'、'.join(usernames)} 离开了聊天室",
+            'timestamp': datetime.now().isoformat(),
+            'room': room
+        }
+
+        return self._broadcast(BroadcastType.USER_LEAVE, broadcast_data, room)
+
+    def broadcast_user_list_update(self, users: List[Dict[str, Any]], user_count: int,
                                   room: str = "main") -> Dict[str, Any]:
         """
         广播用户列表更新
@@ -409,30 +470,29 @@ class BroadcastManager:
                 'event_type': event_type.value
             }
     
-    def _get_target_sockets(self, event_type: BroadcastType, room: str, 
-                           exclude_sockets: Set[str] = None) -> Set[str]:
-        """获取目标Socket列表"""
-        # 获取订阅了该事件类型的Socket
-        event_subscribers = self._subscribers.get(event_type, set())
-        
-        # 获取房间内的Socket
-        room_subscribers = self._room_subscribers.get(room, set())
-        
-        # 取交集
-        target_sockets = event_subscribers & room_subscribers
-        
-        # 排除指定的Socket
-        if exclude_sockets:
-            target_sockets -= exclude_sockets
-        
-        # 过滤掉已断开的连接
-        active_sockets = set()
-        for socket_id in target_sockets:
-            if socket_id in self._socket_subscribers:
+    def _get_target_sockets(self, event_type: BroadcastType, room: str,
+                           exclude_sockets: Set[str] = None) -> List[str]:
+        """获取目标Socket列表（顺序遍历房间紧凑列表）"""
+        room_members = self._room_subscribers.get(room)
+        if not room_members:
+            return []
+
+        # 订阅了该事件类型的Socket
+        event_subscribers = self._subscribers.get(event_type, ())
+
+        now = datetime.now()
+        active_sockets = []
+        for socket_id in room_members:
+            if exclude_sockets and socket_id in exclude_sockets:
+                continue
+            if socket_id not in event_subscribers:
+                continue
+            subscriber_info = self._socket_subscribers.get(socket_id)
+            if subscriber_info is not None:
                 # 更新最后活动时间
-                self._socket_subscribers[socket_id]['last_activity'] = datetime.now()
-                active_sockets.add(socket_id)
-        
+                subscriber_info['last_activity'] = now
+                active_sockets.append(socket_id)
+
         return active_sockets
     
     def _send_to_socket(self, socket_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -2,12 +2,20 @@
 MQTT服务组件
 支持MQTT客户端连接聊天室，实现消息双向同步
 """
-import json
+import functools
+import itertools
 import logging
+import os
+import queue
+import re
 import threading
 import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, Callable, Optional
+import msgspec
+import orjson
 import paho.mqtt.client as mqtt
 from flask import current_app
 
@@ -19,6 +27,75 @@ from services.broadcast_manager import get_broadcast_manager
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 云台控制消息格式: "Ang_X=xxx,Ang_Y=yyy"
+# 模块级预编译，验证和解析都走C层的正则引擎
+_GIMBAL_COMMAND_PATTERN = re.compile(r'^Ang_X=(\d+),Ang_Y=(\d+)$')
+
+
+class UserMessage(msgspec.Struct):
+    """MQTT用户消息载荷"""
+    type: str = 'user_message'
+    username: str = ''
+    content: str = ''
+    timestamp: str = ''
+    message_id: str = ''
+
+
+class AIResponseMessage(msgspec.Struct):
+    """MQTT AI回复载荷"""
+    type: str = 'ai_response'
+    username: str = ''
+    content: str = ''
+    timestamp: str = ''
+    message_id: str = ''
+
+
+class SystemMessage(msgspec.Struct):
+    """MQTT系统消息载荷"""
+    type: str = 'system_message'
+    message: str = ''
+    timestamp: str = ''
+
+
+class MqttUser:
+    """
+    MQTT用户记录
+
+    __slots__紧凑布局；生命周期由_active_users中的强引用决定，
+    对外的WeakValueDictionary视图在强引用消失后自动清空。
+    """
+    __slots__ = ('client_id', 'username', 'join_time', 'message_count',
+                 'last_active', '__weakref__')
+
+    def __init__(self, client_id: str, username: str):
+        self.client_id = client_id
+        self.username = username
+        self.join_time = datetime.now()
+        self.message_count = 0
+        self.last_active = time.time()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（统计接口用）"""
+        return {
+            'client_id': self.client_id,
+            'username': self.username,
+            'join_time': self.join_time,
+            'message_count': self.message_count
+        }
+
+
+@functools.lru_cache(maxsize=256)
+def _build_system_payload(message: str, timestamp_bucket: int) -> bytes:
+    """
+    构建系统消息载荷（按秒分桶缓存）
+
+    同一秒内重复的系统消息（如连接通知）直接复用序列化结果。
+    """
+    return msgspec.json.encode(SystemMessage(
+        message=message,
+        timestamp=datetime.fromtimestamp(timestamp_bucket).isoformat()
+    ))
+
 
 class MQTTService:
     """MQTT服务管理器"""
@@ -35,22 +112,72 @@ class MQTTService:
         self.broker_port = broker_port
         
         # MQTT客户端配置
-        self.client = mqtt.Client()
+        # 持久会话避免重连后重做订阅；放宽飞行窗口并限制排队上限，
+        # 突发发布吞吐更高且断线期间内存有界
+        self.client = mqtt.Client(
+            client_id=f'chatroom-{os.getpid()}',
+            clean_session=False
+        )
+        self.client.max_inflight_messages_set(1000)
+        self.client.max_queued_messages_set(10000)
+        self.client.reconnect_delay_set(min_delay=1, max_delay=30)
+        if logger.isEnabledFor(logging.DEBUG):
+            self.client.enable_logger(logger)
         self.client.on_connect = self._on_connect
         self.client.on_message = self._on_message
         self.client.on_disconnect = self._on_disconnect
-        
+
+        # 复用同一个编码器，避免每次发布时的初始化开销
+        self._encoder = msgspec.json.Encoder()
+
+        # 发布队列: 调用方只入队，由单个后台写线程批量排空
+        # 避免突发流量下每条消息一次同步publish的开销
+        self._publish_queue = queue.SimpleQueue()
+        self._writer_thread = None
+
+        # 发布客户端池: 多条TCP连接轮询分担发布流量
+        # (单个paho客户端在socket层串行化所有publish)
+        self._pub_clients = []
+        self._pub_cycle = None
+
+        # 已序列化载荷缓存: (kind, message_id) -> bytes，FIFO淘汰
+        # 同一条消息被多路径转发时只序列化一次
+        self._payload_cache = {}
+        self._payload_cache_max = 512
+
+        # 耗时的消息处理（AI调用、云台控制）移出paho回调线程，
+        # 避免单条消息阻塞整个网络循环
+        self._ingest_executor = ThreadPoolExecutor(
+            max_workers=8, thread_name_prefix='mqtt-ingest'
+        )
+
         # 服务组件
-        self.message_handler = None  # 延迟初始化
-        self.user_manager = get_user_manager()
-        self.broadcast_manager = get_broadcast_manager()
+        # 全部延迟初始化: 构造MQTTService不触发各单例的启动开销
+        self._message_handler = None
+        self._user_manager = None
+        self._broadcast_manager = None
         
         # 状态管理
         self.is_connected = False
         self.is_running = False
-        self.mqtt_users = {}  # client_id -> user_info 映射
+        # client_id -> MqttUser: _active_users持强引用并按TTL淘汰，
+        # mqtt_users是弱引用视图，强引用消失后条目自动回收
+        self._active_users = {}
+        self.mqtt_users = weakref.WeakValueDictionary()
+        self.MQTT_USER_TTL = 600  # 秒，无活动即视为已离线
         self.gimbal_devices = {}  # client_id -> gimbal_info 映射
         self.is_gimbal_online = False
+
+        # 保护mqtt_users/gimbal_devices/stats的并发访问
+        # (MQTT回调线程与get_statistics/stop等公共入口会同时读写)
+        self._state_lock = threading.RLock()
+
+        # 连接建立事件，start()据此等待而非轮询
+        self._connected_event = threading.Event()
+
+        # 合并加入/离开通知: 100ms窗口内的变更只发布一条presence_delta
+        self._presence_pending = {'joined': [], 'left': []}
+        self._presence_timer = None
         
         # MQTT主题配置
         self.topics = {
@@ -63,11 +190,40 @@ class MQTTService:
             'gimbal_register': 'device/gimbal/register',  # 云台注册主题
             'gimbal_status': 'device/gimbal/status'  # 云台状态主题
         }
-        
+
+        # 主题列表固定不变，预先物化供get_statistics直接复用
+        self._topics_list = tuple(self.topics.values())
+
+        # 热路径发布主题提前取出，省去每次发布的字典查找
+        # (paho 1.6的publish只接受str主题并自行encode，无法预编码bytes)
+        self._topic_chat_out = self.topics['chat_out']
+        self._topic_system = self.topics['system']
+
+        # 预构建订阅列表，连接时一次性批量订阅
+        self._subscribe_batch = [
+            (self.topics[name], 0)
+            for name in ('chat_in', 'user_join', 'user_leave', 'gimbal_register', 'gimbal_status')
+        ]
+
+        # 主题到处理器的分发表，_on_message一次字典查找完成路由
+        # 统一签名为 (msg_data, payload)
+        self._topic_handlers = {
+            self.topics['chat_in']:
+                lambda data, payload: self._ingest_executor.submit(self._handle_chat_message, data),
+            self.topics['user_join']:
+                lambda data, payload: self._handle_mqtt_user_join(data),
+            self.topics['user_leave']:
+                lambda data, payload: self._handle_mqtt_user_leave(data.get('client_id', 'unknown')),
+            self.topics['gimbal_register']:
+                lambda data, payload: self._handle_gimbal_register(data),
+            self.topics['gimbal_status']:
+                lambda data, payload: self._handle_gimbal_status(data),
+            self.topics['gimbal_control']:
+                lambda data, payload: self._ingest_executor.submit(self._handle_gimbal_control, payload),
+        }
+
         # 统计信息
         self.stats = {
-            'mqtt_users_count': 0,
-            'gimbal_devices_count': 0,
             'messages_received': 0,
             'messages_sent': 0,
             'gimbal_commands_sent': 0,
@@ -76,7 +232,30 @@ class MQTTService:
         }
         
         logger.info(f"MQTT服务初始化完成: {broker_host}:{broker_port}")
-    
+
+    @property
+    def message_handler(self):
+        """消息处理器（首次访问时初始化）"""
+        if self._message_handler is None:
+            from services.message_handler import get_message_handler
+            self._message_handler = get_message_handler()
+        return self._message_handler
+
+    @property
+    def user_manager(self):
+        """用户管理器（首次访问时初始化）"""
+        if self._user_manager is None:
+            self._user_manager = get_user_manager()
+        return self._user_manager
+
+    @property
+    def broadcast_manager(self):
+        """广播管理器（首次访问时初始化）"""
+        if self._broadcast_manager is None:
+            self._broadcast_manager = get_broadcast_manager()
+        return self._broadcast_manager
+
+
     def start(self) -> bool:
         """
         启动MQTT服务
@@ -96,14 +275,18 @@ class MQTTService:
             # 启动网络循环
             self.client.loop_start()
             self.is_running = True
+
+            # 启动发布写线程
+            self._writer_thread = threading.Thread(
+                target=self._publish_writer, name="mqtt-publish-writer", daemon=True
+            )
+            self._writer_thread.start()
             
-            # 等待连接建立
-            retry_count = 0
-            while not self.is_connected and retry_count < 10:
-                time.sleep(0.5)
-                retry_count += 1
-            
+            # 等待连接建立（事件驱动，连接成功立即返回）
+            self._connected_event.wait(timeout=5.0)
+
             if self.is_connected:
+                self._start_publisher_pool()
                 logger.info("MQTT服务启动成功")
                 return True
             else:
@@ -115,6 +298,39 @@ class MQTTService:
             logger.error(f"MQTT服务启动失败: {e}")
             return False
     
+    def _start_publisher_pool(self, pool_size: int = 4):
+        """
+        启动发布客户端池
+
+        Args:
+            pool_size: 池中客户端数量
+        """
+        try:
+            for i in range(pool_size):
+                pub_client = mqtt.Client(client_id=f'chatroom-pub-{os.getpid()}-{i}')
+                pub_client.connect(self.broker_host, self.broker_port, 60)
+                pub_client.loop_start()
+                self._pub_clients.append(pub_client)
+
+            self._pub_cycle = itertools.cycle(self._pub_clients)
+            logger.info(f"发布客户端池已启动: {pool_size}个连接")
+
+        except Exception as e:
+            # 池启动失败不影响服务，回退到主客户端发布
+            logger.error(f"发布客户端池启动失败，回退到主客户端: {e}")
+            self._stop_publisher_pool()
+
+    def _stop_publisher_pool(self):
+        """停止并清空发布客户端池"""
+        for pub_client in self._pub_clients:
+            try:
+                pub_client.loop_stop()
+                pub_client.disconnect()
+            except Exception as e:
+                logger.error(f"关闭发布客户端异常: {e}")
+        self._pub_clients = []
+        self._pub_cycle = None
+
     def stop(self):
         """停止MQTT服务"""
         try:
@@ -128,18 +344,42 @@ class MQTTService:
                 self._publish_system_message("MQTT服务即将停止")
                 time.sleep(0.1)
             
+            # 批量清理MQTT用户和云台设备
+            # (逐个调用_handle_mqtt_user_leave会对每个用户发布一条系统消息)
+            with self._state_lock:
+                usernames = [user.username for user in self._active_users.values()]
+                n_users = len(usernames)
+                n_gimbals = len(self.gimbal_devices)
+                self._active_users.clear()
+                self.mqtt_users.clear()
+                self.gimbal_devices.clear()
+                self.is_gimbal_online = False
+
+            if usernames:
+                logger.info(f"MQTT用户批量离开: {', '.join(usernames)}")
+
+            # 立即刷出未发布的在线状态变更
+            if self._presence_timer is not None:
+                self._presence_timer.cancel()
+            self._flush_presence_updates()
+
+            if self.is_connected and (n_users or n_gimbals):
+                self._publish_system_message(f"MQTT服务停止: {n_users}个用户, {n_gimbals}个云台设备离线")
+
+            # 停止消息处理线程池（不等待未完成的任务）
+            self._ingest_executor.shutdown(wait=False, cancel_futures=True)
+
+            # 通知写线程退出并等待队列排空
+            if self._writer_thread is not None:
+                self._publish_queue.put(None)
+                self._writer_thread.join(timeout=2.0)
+                self._writer_thread = None
+
             # 断开连接
+            self._stop_publisher_pool()
             self.client.loop_stop()
             self.client.disconnect()
-            
-            # 清理MQTT用户
-            for client_id in list(self.mqtt_users.keys()):
-                self._handle_mqtt_user_leave(client_id)
-            
-            # 清理云台设备
-            for client_id in list(self.gimbal_devices.keys()):
-                self._handle_gimbal_disconnect(client_id)
-            
+
             self.is_connected = False
             logger.info("MQTT服务已停止")
             
@@ -150,14 +390,14 @@ class MQTTService:
         """MQTT连接回调"""
         if rc == 0:
             self.is_connected = True
-            self.stats['connect_time'] = datetime.now()
+            self._connected_event.set()
+            with self._state_lock:
+                self.stats['connect_time'] = datetime.now()
             logger.info("MQTT连接成功")
             
-            # 订阅相关主题
-            for topic_name, topic in self.topics.items():
-                if topic_name in ['chat_in', 'user_join', 'user_leave', 'gimbal_register', 'gimbal_status']:
-                    client.subscribe(topic)
-                    logger.info(f"订阅主题: {topic}")
+            # 批量订阅相关主题（单个SUBSCRIBE包，减少往返次数）
+            client.subscribe(self._subscribe_batch)
+            logger.info(f"批量订阅主题: {[topic for topic, _ in self._subscribe_batch]}")
             
             # 发送连接成功消息
             self._publish_system_message("MQTT服务已连接")
@@ -169,41 +409,42 @@ class MQTTService:
     def _on_disconnect(self, client, userdata, rc):
         """MQTT断开连接回调"""
         self.is_connected = False
+        self._connected_event.clear()
         logger.info(f"MQTT连接断开，代码: {rc}")
     
     def _on_message(self, client, userdata, message):
         """MQTT消息回调"""
+        topic = message.topic
+
+        # 快速路径不包在try里，各失败点用窄异常单独处理
         try:
-            topic = message.topic
             payload = message.payload.decode('utf-8')
-            
-            logger.info(f"收到MQTT消息: {topic} -> {payload}")
+        except UnicodeDecodeError:
+            logger.warning(f"丢弃非UTF-8的MQTT消息: {topic}")
+            return
+
+        logger.info(f"收到MQTT消息: {topic} -> {payload}")
+        with self._state_lock:
             self.stats['messages_received'] += 1
-            self.stats['last_message_time'] = datetime.now()
-            
-            # 解析消息内容
-            try:
-                msg_data = json.loads(payload)
-            except json.JSONDecodeError:
-                # 如果不是JSON格式，当作普通文本处理
-                msg_data = {'message': payload}
-            
-            # 根据主题处理消息
-            if topic == self.topics['chat_in']:
-                self._handle_chat_message(msg_data)
-            elif topic == self.topics['user_join']:
-                self._handle_mqtt_user_join(msg_data)
-            elif topic == self.topics['user_leave']:
-                self._handle_mqtt_user_leave_msg(msg_data)
-            elif topic == self.topics['gimbal_register']:
-                self._handle_gimbal_register(msg_data)
-            elif topic == self.topics['gimbal_status']:
-                self._handle_gimbal_status(msg_data)
-            elif topic == self.topics['gimbal_control']:
-                self._handle_gimbal_control(payload)
-            
+            # 存浮点时间戳，isoformat推迟到get_statistics读取时
+            self.stats['last_message_time'] = time.time()
+
+        # 解析消息内容（orjson直接处理bytes，省去一次中间分发）
+        try:
+            msg_data = orjson.loads(message.payload)
+        except orjson.JSONDecodeError:
+            # 如果不是JSON格式，当作普通文本处理
+            msg_data = {'message': payload}
+
+        # 根据主题分发消息（单次字典查找代替逐个字符串比较）
+        handler = self._topic_handlers.get(topic)
+        if handler is None:
+            return
+
+        try:
+            handler(msg_data, payload)
         except Exception as e:
-            logger.error(f"处理MQTT消息异常: {e}")
+            logger.error(f"处理MQTT消息异常: {topic} -> {e}")
     
     def _handle_chat_message(self, msg_data: Dict[str, Any]):
         """
@@ -224,11 +465,6 @@ class MQTTService:
             # 确保MQTT用户存在
             self._ensure_mqtt_user_exists(client_id, username)
             
-            # 延迟初始化message_handler
-            if self.message_handler is None:
-                from services.message_handler import get_message_handler
-                self.message_handler = get_message_handler()
-            
             # 处理消息
             result = self.message_handler.process_message(
                 message_content=message,
@@ -266,18 +502,15 @@ class MQTTService:
             username = msg_data.get('username', f'MQTT用户{client_id}')
             
             # 创建MQTT用户
-            user_info = {
-                'client_id': client_id,
-                'username': username,
-                'join_time': datetime.now(),
-                'message_count': 0
-            }
-            
-            self.mqtt_users[client_id] = user_info
-            self.stats['mqtt_users_count'] = len(self.mqtt_users)
-            
-            # 发送系统消息
-            self._publish_system_message(f"MQTT用户 {username} 加入了聊天室")
+            mqtt_user = MqttUser(client_id, username)
+
+            with self._state_lock:
+                self._evict_stale_mqtt_users()
+                self._active_users[client_id] = mqtt_user
+                self.mqtt_users[client_id] = mqtt_user
+
+            # 加入合并的在线状态通知
+            self._queue_presence_update(joined=username)
             
             logger.info(f"MQTT用户加入: {username} (client_id: {client_id})")
             
@@ -292,23 +525,19 @@ class MQTTService:
             client_id: MQTT客户端ID
         """
         try:
-            if client_id in self.mqtt_users:
-                user_info = self.mqtt_users.pop(client_id)
-                self.stats['mqtt_users_count'] = len(self.mqtt_users)
-                
-                # 发送系统消息
-                self._publish_system_message(f"MQTT用户 {user_info['username']} 离开了聊天室")
-                
-                logger.info(f"MQTT用户离开: {user_info['username']} (client_id: {client_id})")
+            with self._state_lock:
+                # 丢弃强引用即可，弱引用视图随之清空
+                mqtt_user = self._active_users.pop(client_id, None)
+
+            if mqtt_user:
+                # 加入合并的在线状态通知
+                self._queue_presence_update(left=mqtt_user.username)
+
+                logger.info(f"MQTT用户离开: {mqtt_user.username} (client_id: {client_id})")
                 
         except Exception as e:
             logger.error(f"处理MQTT用户离开异常: {e}")
     
-    def _handle_mqtt_user_leave_msg(self, msg_data: Dict[str, Any]):
-        """处理MQTT用户离开消息"""
-        client_id = msg_data.get('client_id', 'unknown')
-        self._handle_mqtt_user_leave(client_id)
-    
     def _handle_gimbal_control(self, payload: str):
         """
         处理云台控制消息
@@ -389,9 +618,9 @@ class MQTTService:
             }
             
             # 注册云台设备
-            self.gimbal_devices[client_id] = gimbal_info
-            self.stats['gimbal_devices_count'] = len(self.gimbal_devices)
-            self.is_gimbal_online = True
+            with self._state_lock:
+                self.gimbal_devices[client_id] = gimbal_info
+                self.is_gimbal_online = True
             
             # 发送系统消息
             self._publish_system_message(f"云台设备 {username} ({client_id}) 已连接")
@@ -421,22 +650,25 @@ class MQTTService:
             current_position = msg_data.get('current_position', {})
             
             # 更新云台设备状态
-            if client_id in self.gimbal_devices:
-                self.gimbal_devices[client_id]['last_seen'] = datetime.now()
-                self.gimbal_devices[client_id]['is_online'] = (status == 'online')
-                
-                if current_position:
-                    self.gimbal_devices[client_id]['current_position'] = current_position
-                
-                # 更新统计信息
-                if 'stats' in msg_data:
-                    self.gimbal_devices[client_id]['stats'] = msg_data['stats']
-                
-                # 更新设备信息中的当前位置
-                if 'device_info' in self.gimbal_devices[client_id]:
+            with self._state_lock:
+                known_device = client_id in self.gimbal_devices
+                if known_device:
+                    self.gimbal_devices[client_id]['last_seen'] = datetime.now()
+                    self.gimbal_devices[client_id]['is_online'] = (status == 'online')
+
                     if current_position:
-                        self.gimbal_devices[client_id]['device_info']['current_position'] = current_position
-            else:
+                        self.gimbal_devices[client_id]['current_position'] = current_position
+
+                    # 更新统计信息
+                    if 'stats' in msg_data:
+                        self.gimbal_devices[client_id]['stats'] = msg_data['stats']
+
+                    # 更新设备信息中的当前位置
+                    if 'device_info' in self.gimbal_devices[client_id]:
+                        if current_position:
+                            self.gimbal_devices[client_id]['device_info']['current_position'] = current_position
+
+            if not known_device:
                 # 如果设备不存在但发送了状态，创建一个简单的设备记录
                 gimbal_info = {
                     'client_id': client_id,
@@ -454,16 +686,17 @@ class MQTTService:
                     'stats': msg_data.get('stats', {})
                 }
                 
-                self.gimbal_devices[client_id] = gimbal_info
-                self.stats['gimbal_devices_count'] = len(self.gimbal_devices)
-                
+                with self._state_lock:
+                    self.gimbal_devices[client_id] = gimbal_info
+
+                    # 更新全局状态
+                    self.is_gimbal_online = any(
+                        device['is_online'] for device in self.gimbal_devices.values()
+                    )
+
                 logger.info(f"创建新的云台设备记录: {client_id}")
-                
-                # 更新全局状态
-                self.is_gimbal_online = any(
-                    device['is_online'] for device in self.gimbal_devices.values()
-                )
-                
+
+
                 if status == 'offline':
                     self._publish_system_message(f"云台设备 {client_id} 已离线")
                     self.broadcast_manager.broadcast_system_notification(
@@ -484,15 +717,15 @@ class MQTTService:
             client_id: 云台设备ID
         """
         try:
-            if client_id in self.gimbal_devices:
-                gimbal_info = self.gimbal_devices.pop(client_id)
-                self.stats['gimbal_devices_count'] = len(self.gimbal_devices)
-                
+            with self._state_lock:
+                gimbal_info = self.gimbal_devices.pop(client_id, None)
+
                 # 更新全局状态
                 self.is_gimbal_online = any(
                     device['is_online'] for device in self.gimbal_devices.values()
                 )
-                
+
+            if gimbal_info:
                 # 发送系统消息
                 self._publish_system_message(f"云台设备 {gimbal_info['username']} 已断开连接")
                 
@@ -502,13 +735,118 @@ class MQTTService:
             logger.error(f"处理云台设备断开连接异常: {e}")
     
     def _ensure_mqtt_user_exists(self, client_id: str, username: str):
-        """确保MQTT用户存在"""
-        if client_id not in self.mqtt_users:
-            self._handle_mqtt_user_join({
-                'client_id': client_id,
-                'username': username
-            })
+        """确保MQTT用户存在，并刷新其活跃时间"""
+        with self._state_lock:
+            mqtt_user = self._active_users.get(client_id)
+            if mqtt_user is not None:
+                mqtt_user.last_active = time.time()
+                return
+
+        self._handle_mqtt_user_join({
+            'client_id': client_id,
+            'username': username
+        })
+
+    def _evict_stale_mqtt_users(self):
+        """淘汰超过TTL无活动的MQTT用户（调用方需持有_state_lock）"""
+        deadline = time.time() - self.MQTT_USER_TTL
+        stale = [cid for cid, user in self._active_users.items()
+                 if user.last_active < deadline]
+        for cid in stale:
+            user = self._active_users.pop(cid)
+            logger.info(f"MQTT用户超时回收: {user.username} (client_id: {cid})")
     
+    def _queue_presence_update(self, joined: str = None, left: str = None):
+        """
+        记录用户加入/离开，在100ms防抖窗口后合并发布
+
+        Args:
+            joined: 加入的用户名（可选）
+            left: 离开的用户名（可选）
+        """
+        with self._state_lock:
+            if joined:
+                self._presence_pending['joined'].append(joined)
+            if left:
+                self._presence_pending['left'].append(left)
+
+            if self._presence_timer is None:
+                self._presence_timer = threading.Timer(0.1, self._flush_presence_updates)
+                self._presence_timer.daemon = True
+                self._presence_timer.start()
+
+    def _flush_presence_updates(self):
+        """发布合并后的在线状态变更"""
+        with self._state_lock:
+            joined = self._presence_pending['joined']
+            left = self._presence_pending['left']
+            self._presence_pending = {'joined': [], 'left': []}
+            self._presence_timer = None
+
+        if not (joined or left) or not self.is_connected:
+            return
+
+        payload = orjson.dumps({
+            'type': 'presence_delta',
+            'joined': joined,
+            'left': left,
+            'timestamp': datetime.now().isoformat()
+        })
+        self._enqueue_publish(self._topic_system, payload)
+
+    def _cache_payload(self, key: tuple, payload: bytes):
+        """缓存已序列化的消息载荷，超出容量时FIFO淘汰最旧条目"""
+        if len(self._payload_cache) >= self._payload_cache_max:
+            self._payload_cache.pop(next(iter(self._payload_cache)))
+        self._payload_cache[key] = payload
+
+    def _enqueue_publish(self, topic: str, payload: bytes):
+        """
+        将待发布消息入队，由后台写线程统一发出
+
+        Args:
+            topic: MQTT主题
+            payload: 已序列化的消息内容
+        """
+        if self._writer_thread is not None:
+            self._publish_queue.put((topic, payload))
+        else:
+            # 写线程未启动时直接发布（兼容未经start()的用法）
+            self.client.publish(topic, payload)
+            with self._state_lock:
+                self.stats['messages_sent'] += 1
+
+    def _publish_writer(self):
+        """后台写线程: 批量排空发布队列，摊薄paho每次publish的开销"""
+        stopping = False
+        while not stopping:
+            item = self._publish_queue.get()
+            if item is None:
+                break
+
+            # 尽量多取一批待发消息（上限64条），一次性连续发出
+            batch = [item]
+            while len(batch) < 64:
+                try:
+                    next_item = self._publish_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if next_item is None:
+                    stopping = True
+                    break
+                batch.append(next_item)
+
+            # 轮询选一个发布连接，整批连续发出
+            publish_client = next(self._pub_cycle) if self._pub_cycle else self.client
+
+            try:
+                for topic, payload in batch:
+                    publish_client.publish(topic, payload)
+                with self._state_lock:
+                    self.stats['messages_sent'] += len(batch)
+            except Exception as e:
+                logger.error(f"批量发布MQTT消息异常: {e}")
+
     def _publish_chat_message(self, message, ai_response=None):
         """
         发布聊天消息到MQTT
@@ -517,36 +855,41 @@ class MQTTService:
             message: 用户消息对象
             ai_response: AI回复对象（可选）
         """
+        if not self.is_connected:
+            return
+
         try:
-            if not self.is_connected:
-                return
-            
-            # 发布用户消息
-            msg_data = {
-                'type': 'user_message',
-                'username': message.username,
-                'content': message.content,
-                'timestamp': message.timestamp.isoformat(),
-                'message_id': message.id
-            }
-            
-            self.client.publish(self.topics['chat_out'], json.dumps(msg_data))
-            self.stats['messages_sent'] += 1
-            
+            # 发布用户消息（同一消息ID只序列化一次）
+            payload = self._payload_cache.get(('user', message.id))
+            if payload is None:
+                msg_data = UserMessage(
+                    username=message.username,
+                    content=message.content,
+                    timestamp=message.timestamp.isoformat(),
+                    message_id=message.id
+                )
+                payload = self._encoder.encode(msg_data)
+                self._cache_payload(('user', message.id), payload)
+
+            self._enqueue_publish(self._topic_chat_out, payload)
+
             # 发布AI回复
             if ai_response:
-                ai_data = {
-                    'type': 'ai_response',
-                    'username': ai_response.username,
-                    'content': ai_response.content,
-                    'timestamp': ai_response.timestamp.isoformat(),
-                    'message_id': ai_response.id
-                }
-                
-                self.client.publish(self.topics['chat_out'], json.dumps(ai_data))
-                self.stats['messages_sent'] += 1
-                
-        except Exception as e:
+                ai_payload = self._payload_cache.get(('ai', ai_response.id))
+                if ai_payload is None:
+                    ai_data = AIResponseMessage(
+                        username=ai_response.username,
+                        content=ai_response.content,
+                        timestamp=ai_response.timestamp.isoformat(),
+                        message_id=ai_response.id
+                    )
+                    ai_payload = self._encoder.encode(ai_data)
+                    self._cache_payload(('ai', ai_response.id), ai_payload)
+
+                self._enqueue_publish(self._topic_chat_out, ai_payload)
+
+        except (AttributeError, TypeError) as e:
+            # 消息对象缺字段/类型不对才可能失败，入队本身不会抛
             logger.error(f"发布MQTT消息异常: {e}")
     
     def _publish_system_message(self, message: str):
@@ -556,21 +899,13 @@ class MQTTService:
         Args:
             message: 系统消息内容
         """
-        try:
-            if not self.is_connected:
-                return
-            
-            sys_data = {
-                'type': 'system_message',
-                'message': message,
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            self.client.publish(self.topics['system'], json.dumps(sys_data))
-            self.stats['messages_sent'] += 1
-            
-        except Exception as e:
-            logger.error(f"发布系统消息异常: {e}")
+        if not self.is_connected:
+            return
+
+        self._enqueue_publish(
+            self._topic_system,
+            _build_system_payload(message, int(time.time()))
+        )
     
     def _validate_gimbal_message_format(self, payload: str) -> bool:
         """
@@ -583,11 +918,7 @@ class MQTTService:
         Returns:
             格式是否正确
         """
-        import re
-        
-        # 使用正则表达式验证格式
-        pattern = r'^Ang_X=\d+,Ang_Y=\d+$'
-        return bool(re.match(pattern, payload.strip()))
+        return bool(_GIMBAL_COMMAND_PATTERN.match(payload.strip()))
     
     def _parse_gimbal_angles(self, payload: str) -> tuple:
         """
@@ -599,17 +930,8 @@ class MQTTService:
         Returns:
             (ang_x, ang_y) 元组
         """
-        parts = payload.strip().split(',')
-        
-        # 解析X值
-        x_part = parts[0].split('=')[1]
-        ang_x = int(x_part)
-        
-        # 解析Y值
-        y_part = parts[1].split('=')[1]
-        ang_y = int(y_part)
-        
-        return ang_x, ang_y
+        match = _GIMBAL_COMMAND_PATTERN.match(payload.strip())
+        return int(match.group(1)), int(match.group(2))
     
     def _validate_gimbal_angles(self, ang_x: int, ang_y: int) -> bool:
         """
@@ -648,10 +970,10 @@ class MQTTService:
             logger.info(f"模拟云台控制: 设置X={ang_x}, Y={ang_y}")
             
             # 更新统计
-            self.stats['gimbal_commands_sent'] += 1
+            with self._state_lock:
+                self.stats['gimbal_commands_sent'] += 1
             
             # 模拟控制延迟
-            import time
             time.sleep(0.1)
             
             return True
@@ -662,21 +984,30 @@ class MQTTService:
     
     def get_statistics(self) -> Dict[str, Any]:
         """获取MQTT服务统计信息"""
+        # 短临界区内取快照，isoformat等整理工作在锁外完成
+        with self._state_lock:
+            stats_snapshot = dict(self.stats)
+            users_snapshot = dict(self.mqtt_users)
+            gimbals_snapshot = dict(self.gimbal_devices)
+
         return {
             'is_connected': self.is_connected,
             'is_running': self.is_running,
             'broker_info': f"{self.broker_host}:{self.broker_port}",
-            'mqtt_users_count': self.stats['mqtt_users_count'],
-            'gimbal_devices_count': self.stats['gimbal_devices_count'],
+            'mqtt_users_count': len(users_snapshot),
+            'gimbal_devices_count': len(gimbals_snapshot),
             'is_gimbal_online': self.is_gimbal_online,
-            'messages_received': self.stats['messages_received'],
-            'messages_sent': self.stats['messages_sent'],
-            'gimbal_commands_sent': self.stats['gimbal_commands_sent'],
-            'connect_time': self.stats['connect_time'].isoformat() if self.stats['connect_time'] else None,
-            'last_message_time': self.stats['last_message_time'].isoformat() if self.stats['last_message_time'] else None,
-            'active_topics': list(self.topics.values()),
-            'mqtt_users': list(self.mqtt_users.values()),
-            'gimbal_devices': list(self.gimbal_devices.values()),
+            'messages_received': stats_snapshot['messages_received'],
+            'messages_sent': stats_snapshot['messages_sent'],
+            'gimbal_commands_sent': stats_snapshot['gimbal_commands_sent'],
+            'connect_time': stats_snapshot['connect_time'].isoformat() if stats_snapshot['connect_time'] else None,
+            'last_message_time': (
+                datetime.fromtimestamp(stats_snapshot['last_message_time']).isoformat()
+                if stats_snapshot['last_message_time'] else None
+            ),
+            'active_topics': self._topics_list,
+            'mqtt_users': [user.to_dict() for user in users_snapshot.values()],
+            'gimbal_devices': list(gimbals_snapshot.values()),
             'gimbal_control_topic': self.topics['gimbal_control'],
             'gimbal_register_topic': self.topics['gimbal_register'],
             'gimbal_status_topic': self.topics['gimbal_status']
@@ -729,7 +1060,8 @@ class MQTTService:
             
             if result.rc == 0:
                 logger.info(f"云台控制指令已发送: {mqtt_command} (来自用户: {username})")
-                self.stats['gimbal_commands_sent'] += 1
+                with self._state_lock:
+                    self.stats['gimbal_commands_sent'] += 1
                 
                 # 发送系统消息通知
                 self._publish_system_message(
@@ -759,8 +1091,11 @@ class MQTTService:
         """
         try:
             gimbal_status_list = []
-            
-            for client_id, gimbal_info in self.gimbal_devices.items():
+
+            with self._state_lock:
+                gimbals_snapshot = dict(self.gimbal_devices)
+
+            for client_id, gimbal_info in gimbals_snapshot.items():
                 # 基础状态信息
                 status_info = {
                     'client_id': client_id,
@@ -803,8 +1138,11 @@ class MQTTService:
         """
         try:
             device_list = []
-            
-            for client_id, gimbal_info in self.gimbal_devices.items():
+
+            with self._state_lock:
+                gimbals_snapshot = dict(self.gimbal_devices)
+
+            for client_id, gimbal_info in gimbals_snapshot.items():
                 # 基础设备信息
                 device_info = {
                     'client_id': client_id,
@@ -852,7 +1190,12 @@ def get_mqtt_service(broker_host: str = "localhost", broker_port: int = 1883) ->
         MQTT服务实例
     """
     global _mqtt_service
-    
+
+    # 双重检查锁定: 单例建立后快速路径无需加锁
+    service = _mqtt_service
+    if service is not None:
+        return service
+
     with _mqtt_service_lock:
         if _mqtt_service is None:
             _mqtt_service = MQTTService(broker_host, broker_port)
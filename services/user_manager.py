@@ -4,10 +4,12 @@
 """
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+import functools
+import itertools
 import logging
-import uuid
-import hashlib
-from collections import deque
+import sys
+import threading
+from collections import deque, namedtuple
 
 from models.user import User, create_user
 from models.chat_room import get_chat_room
@@ -17,6 +19,83 @@ from services.chat_history import get_chat_history
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 用户历史记录条目（namedtuple比逐条dict省内存、构建更快）
+UserHistoryEntry = namedtuple(
+    'UserHistoryEntry', 'user_id username ip_address join_time session_id'
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _ip_id_suffix(ip_address: Optional[str]) -> str:
+    """计算用户ID的IP后缀（每个IP只计算一次，进程级缓存）"""
+    if not ip_address:
+        return 'xxxx'
+    ip_parts = ip_address.split('.')
+    return ''.join(ip_parts[-2:]) if len(ip_parts) >= 2 else ip_address[-4:]
+
+
+class _SessionSocketMap:
+    """
+    会话ID与Socket ID的双向映射
+
+    __slots__紧凑布局，两个方向共享同一批键字符串对象，
+    所有配对更新都在内部锁的同一临界区内完成。
+    """
+    __slots__ = ('_fwd', '_inv', '_lock')
+
+    def __init__(self):
+        self._fwd = {}  # session_id -> socket_id
+        self._inv = {}  # socket_id -> session_id
+        self._lock = threading.RLock()
+
+    def bind(self, session_id: str, socket_id: str) -> None:
+        """绑定会话与Socket，旧的Socket绑定被原子替换"""
+        with self._lock:
+            old_socket_id = self._fwd.get(session_id)
+            if old_socket_id:
+                self._inv.pop(old_socket_id, None)
+            self._fwd[session_id] = socket_id
+            self._inv[socket_id] = session_id
+
+    def unbind_session(self, session_id: str) -> Optional[str]:
+        """解除会话绑定，返回对应的socket_id"""
+        with self._lock:
+            socket_id = self._fwd.pop(session_id, None)
+            if socket_id:
+                self._inv.pop(socket_id, None)
+            return socket_id
+
+    def unbind_socket(self, socket_id: str) -> Optional[str]:
+        """解除Socket绑定，返回对应的session_id"""
+        with self._lock:
+            session_id = self._inv.pop(socket_id, None)
+            if session_id:
+                self._fwd.pop(session_id, None)
+            return session_id
+
+    def socket_for(self, session_id: str) -> Optional[str]:
+        """根据会话ID查Socket ID"""
+        return self._fwd.get(session_id)
+
+    def session_for(self, socket_id: str) -> Optional[str]:
+        """根据Socket ID查会话ID"""
+        return self._inv.get(socket_id)
+
+    def has_socket(self, socket_id: str) -> bool:
+        """Socket是否有绑定"""
+        return socket_id in self._inv
+
+    def snapshot(self) -> Dict[str, Dict[str, str]]:
+        """取两个方向的一致快照"""
+        with self._lock:
+            return {
+                'session_to_socket': dict(self._fwd),
+                'socket_to_session': dict(self._inv)
+            }
+
+    def __len__(self) -> int:
+        return len(self._fwd)
+
 
 class UserManager:
     """用户管理器"""
@@ -24,12 +103,28 @@ class UserManager:
     def __init__(self):
         """初始化用户管理器"""
         self.chat_room = get_chat_room()
-        self._session_to_socket = {}  # session_id -> socket_id 映射
-        self._socket_to_session = {}  # socket_id -> session_id 映射
+        self._sockets = _SessionSocketMap()  # session_id <-> socket_id 双向映射
+        self._socket_to_user = {}  # socket_id -> User 直达映射（单次查找）
         self._user_ids = set()  # 已分配的用户ID集合
-        self._ip_users = {}  # ip_address -> [用户列表] 映射
+        self._id_counter = itertools.count()  # 单调ID计数器，天然无冲突
+        self._taken_usernames = set()  # 在线用户名集合（O(1)占用预检）
+        self._display_names = set()  # 在线显示名称集合（O(1)冲突预检）
+        self._session_to_display = {}  # session_id -> 显示名称 映射
+        self._ip_users = {}  # ip_address -> {session_id: User} 映射（O(1)增删）
         self._user_history = deque(maxlen=30)  # 最近30个用户历史记录
+        self._chat_history = None  # 聊天历史服务（首次使用时解析）
+        self._online_users_cache = None  # 序列化用户列表缓存（变更时失效）
         self.MAX_USERS = 30  # 最大用户数量
+
+    def _invalidate_user_list_cache(self) -> None:
+        """使序列化用户列表缓存失效（任何用户列表变更后调用）"""
+        self._online_users_cache = None
+
+    def _history(self):
+        """获取聊天历史服务（实例级缓存，免去每次全局查找）"""
+        if self._chat_history is None:
+            self._chat_history = get_chat_history()
+        return self._chat_history
     
     def generate_user_id(self, ip_address: str = None) -> str:
         """
@@ -41,50 +136,28 @@ class UserManager:
         Returns:
             唯一的用户ID
         """
-        # 生成基于IP和时间的短编码
-        if ip_address:
-            # 使用IP地址的最后两段和时间戳
-            ip_parts = ip_address.split('.')
-            ip_suffix = ''.join(ip_parts[-2:]) if len(ip_parts) >= 2 else ip_address[-4:]
-        else:
-            ip_suffix = 'xxxx'
-        
-        # 生成唯一ID直到找到未使用的
-        attempt = 0
-        while attempt < 1000:  # 防止无限循环
-            timestamp_suffix = str(int(datetime.now().timestamp() * 1000))[-6:]  # 6位时间戳
-            user_id = f"u{ip_suffix}{timestamp_suffix}{attempt:02d}"
-            
-            if user_id not in self._user_ids:
-                self._user_ids.add(user_id)
-                return user_id
-            attempt += 1
-        
-        # 如果无法生成唯一ID，使用UUID
-        fallback_id = f"u{str(uuid.uuid4())[:8]}"
-        self._user_ids.add(fallback_id)
-        return fallback_id
+        # 单调计数器保证唯一，无需重试循环；IP后缀走进程级缓存
+        user_id = f"u{_ip_id_suffix(ip_address)}{next(self._id_counter):08d}"
+        self._user_ids.add(user_id)
+        return user_id
     
     def add_user_to_ip_mapping(self, user: User) -> None:
         """将用户添加到IP映射中"""
         if user.ip_address:
-            if user.ip_address not in self._ip_users:
-                self._ip_users[user.ip_address] = []
-            self._ip_users[user.ip_address].append(user)
-    
+            self._ip_users.setdefault(user.ip_address, {})[user.session_id] = user
+
     def remove_user_from_ip_mapping(self, user: User) -> None:
         """从IP映射中移除用户"""
-        if user.ip_address and user.ip_address in self._ip_users:
-            try:
-                self._ip_users[user.ip_address].remove(user)
-                if not self._ip_users[user.ip_address]:
+        if user.ip_address:
+            bucket = self._ip_users.get(user.ip_address)
+            if bucket is not None:
+                bucket.pop(user.session_id, None)
+                if not bucket:
                     del self._ip_users[user.ip_address]
-            except ValueError:
-                pass  # 用户不在列表中
-    
+
     def get_users_by_ip(self, ip_address: str) -> List[User]:
         """获取指定IP下的所有用户"""
-        return self._ip_users.get(ip_address, [])
+        return list(self._ip_users.get(ip_address, {}).values())
     
     def get_suggested_username_for_ip(self, ip_address: str) -> Optional[str]:
         """
@@ -100,20 +173,24 @@ class UserManager:
             return None
             
         try:
-            chat_history = get_chat_history()
+            chat_history = self._history()
             # 获取该IP最近使用的用户名列表
             recent_usernames = chat_history.get_recent_usernames_for_ip(ip_address, limit=10)
             
-            # 找到第一个当前未被占用的用户名
+            if not recent_usernames:
+                return None
+
+            # 一次取占用集合，每个候选只需一次哈希查找
+            taken = self.chat_room.get_taken_usernames_set()
             for username in recent_usernames:
-                if not self.is_username_taken(username):
-                    logger.info(f"为IP {ip_address} 找到建议用户名: {username}")
+                if username not in taken:
+                    logger.info("为IP %s 找到建议用户名: %s", ip_address, username)
                     return username
-            
+
             return None
             
         except Exception as e:
-            logger.error(f"获取IP建议用户名失败: {e}")
+            logger.error("获取IP建议用户名失败: %s", e)
             return None
     
     def get_username_suggestions_for_ip(self, ip_address: str, limit: int = 3) -> Dict[str, Any]:
@@ -138,7 +215,7 @@ class UserManager:
             return result
             
         try:
-            chat_history = get_chat_history()
+            chat_history = self._history()
             # 获取该IP最近使用的用户名列表
             recent_usernames = chat_history.get_recent_usernames_for_ip(ip_address, limit=limit * 2)
             
@@ -146,25 +223,24 @@ class UserManager:
                 result['has_history'] = True
                 result['recent_usernames'] = recent_usernames
                 
-                # 找到当前可用的用户名
-                available_usernames = []
-                for username in recent_usernames:
-                    if not self.is_username_taken(username):
-                        available_usernames.append(username)
-                        if len(available_usernames) >= limit:
-                            break
-                
+                # 一次取占用集合，批量过滤出可用的用户名
+                taken = self.chat_room.get_taken_usernames_set()
+                available_usernames = [
+                    username for username in recent_usernames
+                    if username not in taken
+                ][:limit]
+
                 result['available_usernames'] = available_usernames
                 
                 # 设置首选建议用户名
                 if available_usernames:
                     result['suggested_username'] = available_usernames[0]
-                    logger.info(f"为IP {ip_address} 提供用户名建议: {available_usernames}")
+                    logger.info("为IP %s 提供用户名建议: %s", ip_address, available_usernames)
             
             return result
             
         except Exception as e:
-            logger.error(f"获取IP用户名建议失败: {e}")
+            logger.error("获取IP用户名建议失败: %s", e)
             return result
     
     def add_user(self, session_id: str, username: str, socket_id: str = None, 
@@ -190,6 +266,11 @@ class UserManager:
             # 检查用户名是否有效
             if not User.is_valid_username(username):
                 return False, "用户名格式无效", None
+
+            # 驻留ID字符串：同一ID在用户对象/映射/历史中共享同一对象
+            session_id = sys.intern(session_id)
+            if socket_id:
+                socket_id = sys.intern(socket_id)
             
             # 检查是否已经在线
             if self.is_user_online_by_session(session_id):
@@ -218,10 +299,15 @@ class UserManager:
             
             # 添加到聊天室
             if self.chat_room.add_user(user):
+                # 记录用户名/显示名称占用
+                self._taken_usernames.add(username)
+                self._display_names.add(user.get_display_name())
+                self._session_to_display[session_id] = user.get_display_name()
+
                 # 记录Socket映射
                 if socket_id:
-                    self._session_to_socket[session_id] = socket_id
-                    self._socket_to_session[socket_id] = session_id
+                    self._sockets.bind(session_id, socket_id)
+                    self._socket_to_user[socket_id] = user
                 
                 # 添加到IP映射
                 self.add_user_to_ip_mapping(user)
@@ -229,22 +315,21 @@ class UserManager:
                 # 记录IP-用户名关联到数据库
                 if ip_address and username:
                     try:
-                        chat_history = get_chat_history()
+                        chat_history = self._history()
                         chat_history.record_ip_username_usage(ip_address, username)
-                        logger.debug(f"IP-用户名关联已记录: {ip_address} -> {username}")
+                        logger.debug("IP-用户名关联已记录: %s -> %s", ip_address, username)
                     except Exception as e:
-                        logger.error(f"记录IP-用户名关联失败: {e}")
+                        logger.error("记录IP-用户名关联失败: %s", e)
                 
                 # 添加到用户历史
-                self._user_history.append({
-                    'user_id': user.user_id,
-                    'username': user.username,
-                    'ip_address': user.ip_address,
-                    'join_time': user.join_time,
-                    'session_id': session_id
-                })
+                self._user_history.append(UserHistoryEntry(
+                    user.user_id, user.username, user.ip_address,
+                    user.join_time, session_id
+                ))
                 
-                logger.info(f"用户 {username} (ID: {user_id}, session: {session_id}, IP: {ip_address}) 加入聊天室")
+                self._invalidate_user_list_cache()
+
+                logger.info("用户 %s (ID: %s, session: %s, IP: %s) 加入聊天室", username, user_id, session_id, ip_address)
                 return True, f"欢迎 {username} 加入聊天室！您的ID是: {user_id}", user
             else:
                 # 如果加入失败，移除已分配的用户ID
@@ -252,7 +337,7 @@ class UserManager:
                 return False, "加入聊天室失败", None
                 
         except Exception as e:
-            logger.error(f"添加用户失败: {e}")
+            logger.error("添加用户失败: %s", e)
             return False, f"系统错误: {str(e)}", None
     
     def remove_user(self, session_id: str) -> Tuple[bool, str, Optional[User]]:
@@ -281,10 +366,16 @@ class UserManager:
             # 从聊天室移除
             removed_user = self.chat_room.remove_user(session_id)
             if removed_user:
+                # 释放用户名/显示名称占用
+                self._taken_usernames.discard(removed_user.username)
+                old_display = self._session_to_display.pop(session_id, None)
+                if old_display:
+                    self._display_names.discard(old_display)
+
                 # 清理Socket映射
-                socket_id = self._session_to_socket.pop(session_id, None)
-                if socket_id:
-                    self._socket_to_session.pop(socket_id, None)
+                old_socket_id = self._sockets.unbind_session(session_id)
+                if old_socket_id:
+                    self._socket_to_user.pop(old_socket_id, None)
                 
                 # 从IP映射中移除
                 self.remove_user_from_ip_mapping(removed_user)
@@ -293,13 +384,15 @@ class UserManager:
                 if removed_user.user_id:
                     self._user_ids.discard(removed_user.user_id)
                 
-                logger.info(f"用户 {removed_user.username} (ID: {removed_user.user_id}, session: {session_id}) 离开聊天室")
+                self._invalidate_user_list_cache()
+
+                logger.info("用户 %s (ID: %s, session: %s) 离开聊天室", removed_user.username, removed_user.user_id, session_id)
                 return True, f"{removed_user.username} 已离开聊天室", removed_user
             else:
                 return False, "移除用户失败", None
                 
         except Exception as e:
-            logger.error(f"移除用户失败: {e}")
+            logger.error("移除用户失败: %s", e)
             return False, f"系统错误: {str(e)}", None
     
     def remove_user_by_socket(self, socket_id: str) -> Tuple[bool, str, Optional[User]]:
@@ -312,7 +405,7 @@ class UserManager:
         Returns:
             (成功标志, 消息, 被移除的用户对象)
         """
-        session_id = self._socket_to_session.get(socket_id)
+        session_id = self._sockets.session_for(socket_id)
         if session_id:
             return self.remove_user(session_id)
         else:
@@ -323,11 +416,8 @@ class UserManager:
         return self.chat_room.get_user_by_session(session_id)
     
     def get_user_by_socket(self, socket_id: str) -> Optional[User]:
-        """根据Socket ID获取用户"""
-        session_id = self._socket_to_session.get(socket_id)
-        if session_id:
-            return self.chat_room.get_user_by_session(session_id)
-        return None
+        """根据Socket ID获取用户（直达映射，单次哈希查找）"""
+        return self._socket_to_user.get(socket_id)
     
     def get_user_by_username(self, username: str) -> Optional[User]:
         """根据用户名获取用户"""
@@ -343,6 +433,10 @@ class UserManager:
     
     def is_username_taken(self, username: str) -> bool:
         """检查用户名是否已被占用"""
+        # O(1)集合预检，命中即返回；未命中再回退到聊天室扫描
+        # (AI用户等不经过add_user注册的用户只能在聊天室中查到)
+        if username in self._taken_usernames:
+            return True
         return self.chat_room.is_username_taken(username)
     
     def is_user_online_by_session(self, session_id: str) -> bool:
@@ -355,54 +449,61 @@ class UserManager:
     
     def is_user_online_by_socket(self, socket_id: str) -> bool:
         """检查用户是否在线（根据Socket ID）"""
-        return socket_id in self._socket_to_session
+        return self._sockets.has_socket(socket_id)
     
     def get_session_by_socket(self, socket_id: str) -> Optional[str]:
         """根据Socket ID获取会话ID"""
-        return self._socket_to_session.get(socket_id)
+        return self._sockets.session_for(socket_id)
     
     def get_socket_by_session(self, session_id: str) -> Optional[str]:
         """根据会话ID获取Socket ID"""
-        return self._session_to_socket.get(session_id)
+        return self._sockets.socket_for(session_id)
     
     def update_socket_mapping(self, session_id: str, new_socket_id: str) -> bool:
         """更新Socket映射"""
         try:
-            # 移除旧映射
-            old_socket_id = self._session_to_socket.get(session_id)
+            session_id = sys.intern(session_id)
+            new_socket_id = sys.intern(new_socket_id)
+
+            # 原子地替换双向映射，避免重连竞争时两表不一致
+            old_socket_id = self._sockets.socket_for(session_id)
+            self._sockets.bind(session_id, new_socket_id)
+
+            # 同步维护socket -> User直达映射
+            user = None
             if old_socket_id:
-                self._socket_to_session.pop(old_socket_id, None)
-            
-            # 建立新映射
-            self._session_to_socket[session_id] = new_socket_id
-            self._socket_to_session[new_socket_id] = session_id
-            
-            logger.info(f"更新Socket映射: {session_id} -> {new_socket_id}")
+                user = self._socket_to_user.pop(old_socket_id, None)
+            if user is None:
+                user = self.chat_room.get_user_by_session(session_id)
+            if user is not None:
+                self._socket_to_user[new_socket_id] = user
+
+            logger.info("更新Socket映射: %s -> %s", session_id, new_socket_id)
             return True
         except Exception as e:
-            logger.error(f"更新Socket映射失败: {e}")
+            logger.error("更新Socket映射失败: %s", e)
             return False
-    
+
     def cleanup_socket_mapping(self, socket_id: str) -> bool:
         """清理Socket映射"""
         try:
-            session_id = self._socket_to_session.pop(socket_id, None)
-            if session_id:
-                self._session_to_socket.pop(session_id, None)
+            self._sockets.unbind_socket(socket_id)
+            self._socket_to_user.pop(socket_id, None)
             return True
         except Exception as e:
-            logger.error(f"清理Socket映射失败: {e}")
+            logger.error("清理Socket映射失败: %s", e)
             return False
     
     def get_user_statistics(self) -> Dict[str, Any]:
         """获取用户统计信息"""
-        stats = self.chat_room.get_chat_statistics()
+        # 只需要在线人数一个字段，不必构建完整的聊天室统计
+        online_users = self.get_online_user_count()
         return {
-            'total_online_users': stats['online_users'],
-            'regular_users': stats['online_users'] - 1,  # 减去AI用户
+            'total_online_users': online_users,
+            'regular_users': online_users - 1,  # 减去AI用户
             'ai_users': 1,
-            'socket_connections': len(self._socket_to_session),
-            'session_mappings': len(self._session_to_socket),
+            'socket_connections': len(self._sockets),
+            'session_mappings': len(self._sockets),
             'max_users_limit': self.MAX_USERS,
             'user_ids_allocated': len(self._user_ids),
             'unique_ips': len(self._ip_users),
@@ -431,7 +532,7 @@ class UserManager:
             return True, "会话验证成功"
             
         except Exception as e:
-            logger.error(f"验证用户会话失败: {e}")
+            logger.error("验证用户会话失败: %s", e)
             return False, f"验证失败: {str(e)}"
     
     def get_user_join_time(self, session_id: str) -> Optional[datetime]:
@@ -443,13 +544,15 @@ class UserManager:
         """获取用户显示信息"""
         user = self.get_user_by_session(session_id)
         if user:
+            # 每次调用只读一次时钟
+            now = datetime.now()
             return {
                 'user_id': user.user_id,
                 'username': user.username,
                 'display_name': user.get_display_name(),
                 'is_ai': user.is_ai,
                 'join_time': user.join_time.isoformat(),
-                'online_duration': (datetime.now() - user.join_time).total_seconds(),
+                'online_duration': (now - user.join_time).total_seconds(),
                 'ip_address': user.ip_address
             }
         return None
@@ -478,48 +581,71 @@ class UserManager:
             if len(new_display_name) > 20:
                 return False, "显示名称不能超过20个字符"
             
-            # 检查是否与其他用户的显示名称冲突
-            for other_user in self.get_online_users():
-                if other_user['session_id'] != session_id and other_user.get('display_name') == new_display_name:
-                    return False, "该显示名称已被使用"
-            
-            # 更新显示名称
+            # 检查是否与其他用户的显示名称冲突（集合O(1)判断）
+            if (new_display_name in self._display_names
+                    and self._session_to_display.get(session_id) != new_display_name):
+                return False, "该显示名称已被使用"
+
+            # 更新显示名称及索引
             old_display_name = user.display_name
             user.display_name = new_display_name
-            
-            logger.info(f"用户 {user.username} (ID: {user.user_id}) 显示名称从 '{old_display_name}' 更新为 '{new_display_name}'")
+
+            previous_display = self._session_to_display.get(session_id)
+            if previous_display:
+                self._display_names.discard(previous_display)
+            self._display_names.add(new_display_name)
+            self._session_to_display[session_id] = new_display_name
+
+            self._invalidate_user_list_cache()
+
+            logger.info("用户 %s (ID: %s) 显示名称从 '%s' 更新为 '%s'", user.username, user.user_id, old_display_name, new_display_name)
             return True, f"显示名称已更新为: {new_display_name}"
             
         except Exception as e:
-            logger.error(f"更新用户显示名称失败: {e}")
+            logger.error("更新用户显示名称失败: %s", e)
             return False, f"系统错误: {str(e)}"
     
-    def get_user_history(self) -> List[Dict[str, Any]]:
+    def get_user_history(self) -> Tuple[Dict[str, Any], ...]:
         """获取用户历史记录"""
-        return list(self._user_history)
+        # 只在对外边界转换为字典，返回不可变元组供只读消费
+        return tuple(entry._asdict() for entry in self._user_history)
     
     def get_ip_statistics(self) -> Dict[str, Any]:
         """获取IP统计信息"""
+        # 单次遍历同时构建明细并求最大值，避免第二次扫描
         ip_stats = {}
+        max_users_per_ip = 0
         for ip, users in self._ip_users.items():
+            user_count = len(users)
+            if user_count > max_users_per_ip:
+                max_users_per_ip = user_count
             ip_stats[ip] = {
-                'user_count': len(users),
-                'usernames': [user.username for user in users],
-                'user_ids': [user.user_id for user in users]
+                'user_count': user_count,
+                'usernames': [user.username for user in users.values()],
+                'user_ids': [user.user_id for user in users.values()]
             }
-        
+
         return {
             'total_ips': len(self._ip_users),
             'ip_details': ip_stats,
-            'max_users_per_ip': max([len(users) for users in self._ip_users.values()]) if self._ip_users else 0
+            'max_users_per_ip': max_users_per_ip
         }
     
+    def get_online_users_cached(self) -> List[Dict[str, Any]]:
+        """获取在线用户列表（走变更失效缓存，仅在用户列表变更后重建）"""
+        users = self._online_users_cache
+        if users is None:
+            users = self.get_online_users()
+            self._online_users_cache = users
+        return users
+
     def broadcast_user_list_update(self) -> Dict[str, Any]:
         """获取用于广播的用户列表更新数据"""
+        users = self.get_online_users_cached()
         return {
             'type': 'users_update',
-            'users': self.get_online_users(),
-            'count': self.get_online_user_count(),
+            'users': users,
+            'count': len(users),
             'timestamp': datetime.now().isoformat()
         }
     
@@ -536,42 +662,51 @@ class UserManager:
     
     def get_all_socket_mappings(self) -> Dict[str, Any]:
         """获取所有Socket映射（调试用）"""
-        return {
-            'session_to_socket': dict(self._session_to_socket),
-            'socket_to_session': dict(self._socket_to_session),
-            'mapping_count': len(self._session_to_socket)
-        }
+        mappings = self._sockets.snapshot()
+        mappings['mapping_count'] = len(self._sockets)
+        return mappings
     
     def __str__(self) -> str:
         """字符串表示"""
-        return f"UserManager(users={self.get_online_user_count()}, sockets={len(self._socket_to_session)})"
+        return f"UserManager(users={self.get_online_user_count()}, sockets={len(self._sockets)})"
     
     def __repr__(self) -> str:
         """详细字符串表示"""
         return (f"UserManager(online_users={self.get_online_user_count()}, "
-                f"socket_connections={len(self._socket_to_session)}, "
-                f"session_mappings={len(self._session_to_socket)})")
+                f"socket_connections={len(self._sockets)})")
+
+
+@functools.cache
+def _build_user_manager() -> UserManager:
+    """构建全局用户管理器（functools.cache保证只构建一次）"""
+    return UserManager()
 
 
 class UserSessionManager:
-    """用户会话管理器（单例模式）"""
+    """用户会话管理器（单例模式，双重检查锁保证多worker下只构建一次）"""
     _instance = None
-    
+    _singleton_lock = threading.Lock()
+
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
+            with cls._singleton_lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._initialized = False
+                    cls._instance = instance
         return cls._instance
-    
+
     def __init__(self):
         if not self._initialized:
-            self.user_manager = UserManager()
-            self._initialized = True
-    
+            with self._singleton_lock:
+                if not self._initialized:
+                    self.user_manager = _build_user_manager()
+                    self._initialized = True
+
     def get_user_manager(self) -> UserManager:
         """获取用户管理器实例"""
         return self.user_manager
-    
+
     @classmethod
     def get_instance(cls) -> 'UserSessionManager':
         """获取会话管理器实例"""
@@ -580,7 +715,7 @@ class UserSessionManager:
 
 def get_user_manager() -> UserManager:
     """获取全局用户管理器实例的便捷函数"""
-    return UserSessionManager.get_instance().get_user_manager()
+    return _build_user_manager()
 
 
 class UserEventHandler:
@@ -2,10 +2,14 @@
 WebSocket处理器组件
 整合所有服务组件，提供统一的WebSocket事件处理接口
 """
+import functools
 import logging
+import queue
+import secrets
+import threading
+import time
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
-import uuid
 
 from models.user import User
 from models.message import Message
@@ -17,6 +21,41 @@ from services.broadcast_manager import BroadcastManager, BroadcastType, get_broa
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 当前时间缓存：[monotonic_ns, datetime对象, ISO字符串]，1ms粒度刷新
+_cached_now = [0, None, '']
+
+
+def _safe_handler(tag: str):
+    """
+    处理器异常包装装饰器
+
+    统一记录异常并返回标准失败结果，处理器本体不再重复try/except样板。
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return fn(self, *args, **kwargs)
+            except Exception as e:
+                logger.error("%s: %s", tag, e)
+                return {
+                    'success': False,
+                    'error': f"{tag}: {e}"
+                }
+        return wrapper
+    return decorator
+
+
+def _now_cached() -> Tuple[datetime, str]:
+    """获取当前时间及其ISO字符串（1ms内复用同一对象，热路径免重复分配）"""
+    t = time.monotonic_ns()
+    if _cached_now[1] is None or t - _cached_now[0] > 1_000_000:
+        now = datetime.now()
+        _cached_now[0] = t
+        _cached_now[1] = now
+        _cached_now[2] = now.isoformat()
+    return _cached_now[1], _cached_now[2]
+
 
 class WebSocketHandler:
     """WebSocket事件处理器"""
@@ -38,6 +77,25 @@ class WebSocketHandler:
         
         # WebSocket连接管理
         self._connections = {}  # socket_id -> 连接信息
+
+        # 消息显示帧缓存：同一条消息广播与返回共用一次格式化结果
+        self._frame_cache = {}  # message_id -> 格式化后的消息数据
+        self._FRAME_CACHE_MAX = 1024  # FIFO上限，防止无界增长
+
+        # 加入时的历史渲染缓存：(消息总数, 渲染好的历史列表)
+        self._history_cache = (-1, [])
+
+        # 用户列表广播合并：100ms防抖定时器，突发加入/离开只广播最终状态
+        self._user_list_timer = None
+        self._user_list_timer_lock = threading.Lock()
+
+        # 异步广播队列：发送路径只需一次入队，扇出由后台线程完成
+        self._bcast_queue = queue.Queue(maxsize=1000)
+        self._dropped_broadcasts = 0  # 队列满时丢弃的广播数
+        self._bcast_thread = threading.Thread(
+            target=self._broadcast_worker, name='ws-broadcast', daemon=True
+        )
+        self._bcast_thread.start()
         self._connection_stats = {
             'total_connections': 0,
             'active_connections': 0,
@@ -45,9 +103,73 @@ class WebSocketHandler:
             'disconnections': 0,
             'start_time': datetime.now()
         }
+        # 启动时间不变，ISO字符串只格式化一次
+        self._start_time_iso = self._connection_stats['start_time'].isoformat()
+        # 统计快照锁：保证读取时计数一致
+        self._stats_lock = threading.Lock()
+        # 计数快照：每次变更后失效，轮询读走缓存副本
+        self._stats_snapshot = None
         
         logger.info("WebSocket处理器初始化完成")
-    
+
+    def _bump_stat(self, key: str, delta: int = 1) -> None:
+        """更新连接计数并使统计快照失效"""
+        with self._stats_lock:
+            self._connection_stats[key] += delta
+            self._stats_snapshot = None
+
+    def _display_frame(self, message: Message) -> Dict[str, Any]:
+        """获取消息的格式化显示帧（按消息ID缓存，一次格式化多处复用）"""
+        frame = self._frame_cache.get(message.id)
+        if frame is None:
+            frame = message.format_for_display()
+            if len(self._frame_cache) >= self._FRAME_CACHE_MAX:
+                # FIFO淘汰最早的缓存项
+                self._frame_cache.pop(next(iter(self._frame_cache)))
+            self._frame_cache[message.id] = frame
+        return frame
+
+    def _schedule_user_list_flush(self) -> None:
+        """安排一次用户列表广播（100ms内的重复请求被合并为一次）"""
+        with self._user_list_timer_lock:
+            if self._user_list_timer is not None:
+                self._user_list_timer.cancel()
+            self._user_list_timer = threading.Timer(0.1, self._flush_user_list)
+            self._user_list_timer.daemon = True
+            self._user_list_timer.start()
+
+    def _flush_user_list(self) -> None:
+        """广播最新的用户列表快照"""
+        with self._user_list_timer_lock:
+            self._user_list_timer = None
+        try:
+            online_users = self.user_manager.get_online_users_cached()
+            self.broadcast_manager.broadcast_user_list_update(
+                users=online_users,
+                user_count=len(online_users),
+                room="main"
+            )
+        except Exception as e:
+            logger.error("用户列表广播失败: %s", e)
+
+    def _broadcast_worker(self) -> None:
+        """后台广播线程：从队列取消息执行扇出，与请求处理解耦"""
+        while True:
+            item = self._bcast_queue.get()
+            if item is None:  # 停止哨兵
+                break
+            message_obj, ai_response, message_data, ai_response_data = item
+            try:
+                self.broadcast_manager.broadcast_message(
+                    message=message_obj,
+                    ai_response=ai_response,
+                    room="main",
+                    message_data=message_data,
+                    ai_response_data=ai_response_data
+                )
+            except Exception as e:
+                logger.error("异步广播失败: %s", e)
+
     def handle_connect(self, socket_id: str, client_info: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         处理客户端连接
@@ -60,26 +182,28 @@ class WebSocketHandler:
             连接处理结果
         """
         try:
-            current_time = datetime.now()
-            
+            current_time = datetime.now()  # connect_time需要精确时间，不走缓存
+            _, server_iso = _now_cached()
+
             # 记录连接信息
             connection_info = {
                 'socket_id': socket_id,
                 'connect_time': current_time,
+                'connect_time_iso': current_time.isoformat(),  # 不变量，连接时格式化一次
                 'client_ip': client_info.get('ip', 'unknown') if client_info else 'unknown',
                 'user_agent': client_info.get('user_agent', 'unknown') if client_info else 'unknown',
                 'session_id': None,  # 用户加入聊天室时设置
                 'username': None,
-                'last_activity': current_time,
+                'last_activity_ns': time.monotonic_ns(),  # 单调整型时钟，超时扫描为纯整数比较
                 'ping_count': 0,
                 'message_count': 0
             }
             
             self._connections[socket_id] = connection_info
-            self._connection_stats['total_connections'] += 1
-            self._connection_stats['active_connections'] += 1
+            self._bump_stat('total_connections')
+            self._bump_stat('active_connections')
             
-            logger.info(f"WebSocket连接建立: {socket_id}")
+            logger.info("WebSocket连接建立: %s", socket_id)
             
             # 自动为新连接分配用户ID
             user_id = self.user_manager.generate_user_id(connection_info['client_ip'])
@@ -89,77 +213,80 @@ class WebSocketHandler:
                 'success': True,
                 'socket_id': socket_id,
                 'user_id': user_id,  # 返回新分配的用户ID
-                'server_time': current_time.isoformat(),
+                'server_time': server_iso,
                 'connection_info': {
                     'socket_id': socket_id,
                     'user_id': user_id,
-                    'server_time': current_time.isoformat(),
+                    'server_time': server_iso,
                     'active_users': len(self.user_manager.get_online_users())
                 }
             }
             
         except Exception as e:
-            logger.error(f"连接处理失败: {e}")
-            self._connection_stats['failed_connections'] += 1
+            logger.error("连接处理失败: %s", e)
+            self._bump_stat('failed_connections')
             return {
                 'success': False,
                 'error': f"连接处理失败: {str(e)}"
             }
     
+    @_safe_handler("断开连接处理失败")
     def handle_disconnect(self, socket_id: str) -> Dict[str, Any]:
         """
         处理客户端断开连接
-        
+
         Args:
             socket_id: Socket连接ID
-            
+
         Returns:
             断开连接处理结果
         """
-        try:
-            # 移除用户（如果已加入聊天室）
-            success, message, removed_user = self.user_manager.remove_user_by_socket(socket_id)
-            
-            # 如果成功移除用户，发送离开通知
-            if success and removed_user:
-                # 广播用户离开事件
-                self.broadcast_manager.broadcast_user_leave(
-                    username=removed_user.username,
-                    user_info=removed_user.to_dict(),
-                    room="main"
-                )
-                
-                # 广播更新的用户列表
-                self.broadcast_manager.broadcast_user_list_update(
-                    users=self.user_manager.get_online_users(),
-                    user_count=self.user_manager.get_online_user_count(),
-                    room="main"
-                )
-            
-            # 取消广播订阅
-            self.broadcast_manager.unsubscribe(socket_id)
-            
-            # 移除连接记录
-            if socket_id in self._connections:
-                del self._connections[socket_id]
-                self._connection_stats['active_connections'] -= 1
-                self._connection_stats['disconnections'] += 1
-            
-            logger.info(f"WebSocket连接断开: {socket_id}")
-            
-            return {
-                'success': True,
-                'message': message,
-                'removed_user': removed_user.to_dict() if removed_user else None
-            }
-            
-        except Exception as e:
-            logger.error(f"断开连接处理失败: {e}")
-            return {
-                'success': False,
-                'error': f"断开连接处理失败: {str(e)}"
-            }
+        return self._disconnect_single(socket_id)
+
+    def _disconnect_single(self, socket_id: str, suppress_broadcast: bool = False) -> Dict[str, Any]:
+        """
+        执行单个连接的断开清理
+
+        Args:
+            socket_id: Socket连接ID
+            suppress_broadcast: 为True时不发送广播（批量清理时由调用方合并广播）
+
+        Returns:
+            断开连接处理结果
+        """
+        # 移除用户（如果已加入聊天室）
+        success, message, removed_user = self.user_manager.remove_user_by_socket(socket_id)
+
+        # 如果成功移除用户，发送离开通知
+        if success and removed_user and not suppress_broadcast:
+            # 广播用户离开事件
+            self.broadcast_manager.broadcast_user_leave(
+                username=removed_user.username,
+                user_info=removed_user.to_dict(),
+                room="main"
+            )
+
+            # 用户列表广播走防抖合并
+            self._schedule_user_list_flush()
+
+        # 取消广播订阅
+        self.broadcast_manager.unsubscribe(socket_id)
+
+        # 移除连接记录
+        if socket_id in self._connections:
+            del self._connections[socket_id]
+            self._bump_stat('active_connections', -1)
+            self._bump_stat('disconnections')
+
+        logger.info("WebSocket连接断开: %s", socket_id)
+
+        return {
+            'success': True,
+            'message': message,
+            'removed_user': removed_user.to_dict() if removed_user else None
+        }
     
+    @_safe_handler("加入聊天室失败")
     def handle_join_room(self, socket_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         处理用户加入聊天室
@@ -171,63 +298,65 @@ class WebSocketHandler:
         Returns:
             加入聊天室处理结果
         """
-        try:
-            # 获取用户名
-            username = data.get('username', '').strip()
-            display_name = data.get('display_name', '').strip() or username
-            if not username:
-                return {
-                    'success': False,
-                    'error': '用户名不能为空'
-                }
-            
-            # 生成会话ID
-            session_id = str(uuid.uuid4())
-            
-            # 获取连接信息
-            connection_info = self._connections.get(socket_id, {})
-            user_id = connection_info.get('user_id')  # 使用预分配的用户ID
-            ip_address = connection_info.get('client_ip')
-            
-            # 添加用户到聊天室
-            success, message, user = self.user_manager.add_user(
-                session_id=session_id,
-                username=username, 
-                socket_id=socket_id,
-                ip_address=ip_address,
-                display_name=display_name
-            )
-            
-            # 如果用户对象没有用户ID，使用预分配的
-            if user and not user.user_id and user_id:
-                user.user_id = user_id
-            
-            if not success:
-                return {
-                    'success': False,
-                    'error': message
-                }
-            
-            # 更新连接信息
-            if socket_id in self._connections:
-                self._connections[socket_id].update({
-                    'session_id': session_id,
-                    'username': username,
-                    'last_activity': datetime.now()
-                })
-            
-            # 订阅广播事件
-            self.broadcast_manager.subscribe(
-                socket_id=socket_id,
-                username=username,
-                room="main"
-            )
-            
-            # 获取聊天历史
+        # 获取用户名
+        username = data.get('username', '').strip()
+        display_name = data.get('display_name', '').strip() or username
+        if not username:
+            return {
+                'success': False,
+                'error': '用户名不能为空'
+            }
+        
+        # 生成会话ID（token_hex比uuid4省去UUID对象构造）
+        session_id = secrets.token_hex(16)
+        
+        # 获取连接信息
+        connection_info = self._connections.get(socket_id, {})
+        user_id = connection_info.get('user_id')  # 使用预分配的用户ID
+        ip_address = connection_info.get('client_ip')
+        
+        # 添加用户到聊天室
+        success, message, user = self.user_manager.add_user(
+            session_id=session_id,
+            username=username, 
+            socket_id=socket_id,
+            ip_address=ip_address,
+            display_name=display_name
+        )
+        
+        # 如果用户对象没有用户ID，使用预分配的
+        if user and not user.user_id and user_id:
+            user.user_id = user_id
+        
+        if not success:
+            return {
+                'success': False,
+                'error': message
+            }
+        
+        # 更新连接信息
+        if socket_id in self._connections:
+            self._connections[socket_id].update({
+                'session_id': session_id,
+                'username': username,
+                'last_activity_ns': time.monotonic_ns()
+            })
+        
+        # 订阅广播事件
+        self.broadcast_manager.subscribe(
+            socket_id=socket_id,
+            username=username,
+            room="main"
+        )
+        
+        # 获取聊天历史（消息总数未变时复用上次渲染结果）
+        history_version = self.chat_history.get_message_count()
+        if history_version == self._history_cache[0]:
+            history_data = self._history_cache[1]
+        else:
             recent_messages = self.chat_history.get_recent_messages(limit=50)
-            history_data = []
-            for msg in recent_messages:
-                history_data.append({
+            history_data = [
+                {
                     'type': 'message',
                     'username': msg.username,
                     'content': msg.content,
@@ -235,49 +364,47 @@ class WebSocketHandler:
                     'is_ai': msg.message_type == 'ai',
                     'is_system': msg.message_type == 'system',
                     'message_id': msg.id
-                })
-            
-            # 创建用户加入系统消息
-            system_message_result = self.message_handler.process_system_message(
-                f"{username} 加入了聊天室"
+                }
+                for msg in recent_messages
+            ]
+            self._history_cache = (history_version, history_data)
+        
+        # 创建用户加入系统消息
+        system_message_result = self.message_handler.process_system_message(
+            f"{username} 加入了聊天室"
+        )
+        
+        # 用户字典与在线列表快照各取一次，响应和广播共用
+        user_info = user.to_dict()
+        online_users = self.user_manager.get_online_users_cached()
+
+        # 准备响应数据
+        response_data = {
+            'success': True,
+            'message': message,
+            'user': user_info,
+            'session_id': session_id,
+            'chat_history': history_data,
+            'online_users': online_users,
+            'server_time': _now_cached()[1]
+        }
+
+        # 广播用户加入事件
+        if system_message_result['success']:
+            self.broadcast_manager.broadcast_user_join(
+                username=username,
+                user_info=user_info,
+                room="main"
             )
-            
-            # 准备响应数据
-            response_data = {
-                'success': True,
-                'message': message,
-                'user': user.to_dict(),
-                'session_id': session_id,
-                'chat_history': history_data,
-                'online_users': self.user_manager.get_online_users(),
-                'server_time': datetime.now().isoformat()
-            }
-            
-            # 广播用户加入事件
-            if system_message_result['success']:
-                self.broadcast_manager.broadcast_user_join(
-                    username=username,
-                    user_info=user.to_dict(),
-                    room="main"
-                )
-                
-                # 广播更新的用户列表
-                self.broadcast_manager.broadcast_user_list_update(
-                    users=self.user_manager.get_online_users(),
-                    user_count=self.user_manager.get_online_user_count(),
-                    room="main"
-                )
-            
-            logger.info(f"用户 {username} 加入聊天室成功")
-            return response_data
-            
-        except Exception as e:
-            logger.error(f"加入聊天室处理失败: {e}")
-            return {
-                'success': False,
-                'error': f"加入聊天室失败: {str(e)}"
-            }
+
+            # 用户列表广播走防抖合并
+            self._schedule_user_list_flush()
+        
+        logger.info("用户 %s 加入聊天室成功", username)
+        return response_data
+        
     
+    @_safe_handler("获取用户名建议失败")
     def handle_get_username_suggestions(self, socket_id: str, data: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         处理获取用户名建议请求（针对重复访问IP）
@@ -289,41 +416,35 @@ class WebSocketHandler:
         Returns:
             用户名建议处理结果
         """
-        try:
-            # 获取连接信息
-            connection_info = self._connections.get(socket_id, {})
-            ip_address = connection_info.get('client_ip')
-            
-            if not ip_address:
-                return {
-                    'success': False,
-                    'error': '无法获取IP地址信息'
-                }
-            
-            # 获取用户名建议
-            suggestions = self.user_manager.get_username_suggestions_for_ip(ip_address, limit=3)
-            
-            response_data = {
-                'success': True,
-                'ip_address': ip_address,
-                'suggestions': suggestions,
-                'message': '获取用户名建议成功'
-            }
-            
-            # 如果有历史记录，提供更友好的提示
-            if suggestions['has_history'] and suggestions['suggested_username']:
-                response_data['message'] = f'欢迎回来！您之前曾使用过以下用户名'
-            
-            logger.info(f"IP {ip_address} 请求用户名建议: {suggestions}")
-            return response_data
-            
-        except Exception as e:
-            logger.error(f"获取用户名建议失败: {e}")
+        # 获取连接信息
+        connection_info = self._connections.get(socket_id, {})
+        ip_address = connection_info.get('client_ip')
+        
+        if not ip_address:
             return {
                 'success': False,
-                'error': f'获取用户名建议失败: {str(e)}'
+                'error': '无法获取IP地址信息'
             }
+        
+        # 获取用户名建议
+        suggestions = self.user_manager.get_username_suggestions_for_ip(ip_address, limit=3)
+        
+        response_data = {
+            'success': True,
+            'ip_address': ip_address,
+            'suggestions': suggestions,
+            'message': '获取用户名建议成功'
+        }
+        
+        # 如果有历史记录，提供更友好的提示
+        if suggestions['has_history'] and suggestions['suggested_username']:
+            response_data['message'] = f'欢迎回来！您之前曾使用过以下用户名'
+        
+        logger.info("IP %s 请求用户名建议: %s", ip_address, suggestions)
+        return response_data
+        
     
+    @_safe_handler("发送消息失败")
     def handle_send_message(self, socket_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         处理发送消息
@@ -335,66 +456,70 @@ class WebSocketHandler:
         Returns:
             发送消息处理结果
         """
-        try:
-            # 获取用户信息
-            user = self.user_manager.get_user_by_socket(socket_id)
-            if not user:
-                return {
-                    'success': False,
-                    'error': '用户未找到，请重新加入聊天室'
-                }
-            
-            # 获取消息内容
-            message_content = data.get('message', '').strip()
-            if not message_content:
-                return {
-                    'success': False,
-                    'error': '消息内容不能为空'
-                }
-            
-            # 更新连接活动时间
-            if socket_id in self._connections:
-                self._connections[socket_id]['last_activity'] = datetime.now()
-                self._connections[socket_id]['message_count'] += 1
-            
-            # 处理消息
-            result = self.message_handler.process_message(
-                message_content=message_content,
-                username=user.username,
-                session_id=user.session_id
-            )
-            
-            if not result['success']:
-                return {
-                    'success': False,
-                    'error': result['error']
-                }
-            
-            # 广播消息
-            if result['message']:
-                # 使用广播管理器的broadcast_message方法
-                self.broadcast_manager.broadcast_message(
-                    message=result['message'],
-                    ai_response=result['ai_response'],
-                    room="main"
-                )
-            
-            logger.info(f"消息发送成功: {user.username} -> {message_content[:50]}...")
-            
+        # 获取用户信息
+        user = self.user_manager.get_user_by_socket(socket_id)
+        if not user:
             return {
-                'success': True,
-                'message': '消息发送成功',
-                'message_data': result['message'].to_dict() if result['message'] else None,
-                'ai_response': result['ai_response'].to_dict() if result['ai_response'] else None
+                'success': False,
+                'error': '用户未找到，请重新加入聊天室'
             }
-            
-        except Exception as e:
-            logger.error(f"发送消息处理失败: {e}")
+        
+        # 获取消息内容
+        message_content = data.get('message', '').strip()
+        if not message_content:
             return {
                 'success': False,
-                'error': f"发送消息失败: {str(e)}"
+                'error': '消息内容不能为空'
             }
+        
+        # 更新连接活动时间
+        if socket_id in self._connections:
+            self._connections[socket_id]['last_activity_ns'] = time.monotonic_ns()
+            self._connections[socket_id]['message_count'] += 1
+        
+        # 处理消息
+        result = self.message_handler.process_message(
+            message_content=message_content,
+            username=user.username,
+            session_id=user.session_id
+        )
+        
+        if not result['success']:
+            return {
+                'success': False,
+                'error': result['error']
+            }
+        
+        # 字典形式只计算一次，广播和返回值共用
+        message_obj = result['message']
+        ai_response = result['ai_response']
+
+        # 广播消息：只入队，扇出在后台线程进行，发送延迟与订阅者数量无关
+        if message_obj:
+            try:
+                self._bcast_queue.put_nowait((
+                    message_obj,
+                    ai_response,
+                    self._display_frame(message_obj),
+                    self._display_frame(ai_response) if ai_response else None
+                ))
+            except queue.Full:
+                # 背压：队列满时丢弃并计数，不阻塞发送路径
+                self._dropped_broadcasts += 1
+                logger.warning("广播队列已满，消息 %s 的广播被丢弃", message_obj.id)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("消息发送成功: %s -> %s...", user.username, message_content[:50])
+
+        return {
+            'success': True,
+            'message': '消息发送成功',
+            'message_data': message_obj.to_dict() if message_obj else None,
+            'ai_response': ai_response.to_dict() if ai_response else None
+        }
+        
     
+    @_safe_handler("心跳处理失败")
     def handle_ping(self, socket_id: str) -> Dict[str, Any]:
         """
         处理心跳检测
@@ -405,26 +530,20 @@ class WebSocketHandler:
         Returns:
             心跳处理结果
         """
-        try:
-            current_time = datetime.now()
-            
-            # 更新连接活动时间
-            if socket_id in self._connections:
-                self._connections[socket_id]['last_activity'] = current_time
-                self._connections[socket_id]['ping_count'] += 1
-            
-            return {
-                'success': True,
-                'timestamp': current_time.timestamp(),
-                'server_time': current_time.isoformat()
-            }
-            
-        except Exception as e:
-            logger.error(f"心跳处理失败: {e}")
-            return {
-                'success': False,
-                'error': f"心跳处理失败: {str(e)}"
-            }
+        now_dt, now_iso = _now_cached()
+
+        # 单次哈希查找取连接记录（替代一次成员检查加两次下标访问）
+        conn_info = self._connections.get(socket_id)
+        if conn_info is not None:
+            conn_info['last_activity_ns'] = time.monotonic_ns()
+            conn_info['ping_count'] += 1
+
+        return {
+            'success': True,
+            'timestamp': now_dt.timestamp(),
+            'server_time': now_iso
+        }
+        
     
     def get_server_info(self) -> Dict[str, Any]:
         """获取服务器信息"""
@@ -432,15 +551,15 @@ class WebSocketHandler:
             return {
                 'server_name': 'AI Chat Room',
                 'version': '1.0.0',
-                'start_time': self._connection_stats['start_time'].isoformat(),
-                'current_time': datetime.now().isoformat(),
+                'start_time': self._start_time_iso,
+                'current_time': _now_cached()[1],
                 'active_connections': self._connection_stats['active_connections'],
                 'total_users': self.user_manager.get_online_user_count(),
                 'total_messages': self.chat_history.get_message_count(),
                 'ai_available': self.message_handler.ai_client.is_available()
             }
         except Exception as e:
-            logger.error(f"获取服务器信息失败: {e}")
+            logger.error("获取服务器信息失败: %s", e)
             return {
                 'error': f"获取服务器信息失败: {str(e)}"
             }
@@ -448,17 +567,29 @@ class WebSocketHandler:
     def get_connection_stats(self) -> Dict[str, Any]:
         """获取连接统计信息"""
         try:
-            stats = self._connection_stats.copy()
+            # 计数快照按变更失效：只有计数变过才重新拷贝一次
+            with self._stats_lock:
+                snapshot = self._stats_snapshot
+                if snapshot is None:
+                    snapshot = self._connection_stats.copy()
+                    self._stats_snapshot = snapshot
+            stats = dict(snapshot)
             stats['current_time'] = datetime.now().isoformat()
             stats['connections'] = []
+
+            # 单调时钟差值换算回挂钟时间，仅在统计读取时进行
+            now_wall = time.time()
+            now_ns = time.monotonic_ns()
             
             # 添加当前连接信息（不包含敏感信息）
             for socket_id, conn_info in self._connections.items():
                 stats['connections'].append({
                     'socket_id': socket_id,
                     'username': conn_info.get('username'),
-                    'connect_time': conn_info['connect_time'].isoformat(),
-                    'last_activity': conn_info['last_activity'].isoformat(),
+                    'connect_time': conn_info['connect_time_iso'],
+                    'last_activity': datetime.fromtimestamp(
+                        now_wall - (now_ns - conn_info['last_activity_ns']) / 1e9
+                    ).isoformat(),
                     'ping_count': conn_info['ping_count'],
                     'message_count': conn_info['message_count']
                 })
@@ -466,7 +597,7 @@ class WebSocketHandler:
             return stats
             
         except Exception as e:
-            logger.error(f"获取连接统计失败: {e}")
+            logger.error("获取连接统计失败: %s", e)
             return {
                 'error': f"获取连接统计失败: {str(e)}"
             }
@@ -482,25 +613,41 @@ class WebSocketHandler:
             清理的连接数量
         """
         try:
-            current_time = datetime.now()
-            inactive_sockets = []
-            
-            for socket_id, conn_info in self._connections.items():
-                time_diff = (current_time - conn_info['last_activity']).total_seconds()
-                if time_diff > timeout_seconds:
-                    inactive_sockets.append(socket_id)
-            
+            # 单调纳秒整数直接比较，扫描过程无对象分配
+            now_ns = time.monotonic_ns()
+            timeout_ns = timeout_seconds * 1_000_000_000
+            inactive_sockets = [
+                socket_id
+                for socket_id, conn_info in self._connections.items()
+                if now_ns - conn_info['last_activity_ns'] > timeout_ns
+            ]
+            
+            # 逐个静默清理，广播在批量结束后合并为一次
             cleanup_count = 0
+            removed_users_info = []
             for socket_id in inactive_sockets:
-                result = self.handle_disconnect(socket_id)
+                try:
+                    result = self._disconnect_single(socket_id, suppress_broadcast=True)
+                except Exception as e:
+                    logger.error("清理连接 %s 失败: %s", socket_id, e)
+                    continue
                 if result['success']:
                     cleanup_count += 1
-            
+                    if result['removed_user']:
+                        removed_users_info.append(result['removed_user'])
+
+            # N个离开事件合并为一次批量通知加一次用户列表更新
+            if removed_users_info:
+                self.broadcast_manager.broadcast_user_leave_batch(
+                    removed_users_info, room="main"
+                )
+                self._schedule_user_list_flush()
+
             if cleanup_count > 0:
-                logger.info(f"清理了 {cleanup_count} 个不活跃连接")
+                logger.info("清理了 %s 个不活跃连接", cleanup_count)
             
             return cleanup_count
             
         except Exception as e:
-            logger.error(f"清理不活跃连接失败: {e}")
+            logger.error("清理不活跃连接失败: %s", e)
             return 0
\ No newline at end of file
@@ -14,24 +14,26 @@ def setup_test_data():
     
     try:
         conn = sqlite3.connect('chat_history.db')
-        cursor = conn.cursor()
-        
+        conn.execute('PRAGMA journal_mode=WAL')  # 更快的提交
+
         test_ip = "127.0.0.1"  # 本地测试IP
         test_usernames = ["小明", "小红", "小刚"]
-        
-        # 先清除可能存在的测试数据
-        cursor.execute('DELETE FROM ip_username_history WHERE ip_address = ?', (test_ip,))
-        
-        # 插入测试的IP-用户名关联数据
-        for i, username in enumerate(test_usernames):
-            now = datetime.now()
-            cursor.execute('''
-                INSERT INTO ip_username_history 
+
+        # 时间戳对每行相同，循环外只格式化一次
+        now_iso = datetime.now().isoformat()
+        rows = [
+            (test_ip, username, now_iso, now_iso, i + 1)
+            for i, username in enumerate(test_usernames)
+        ]
+
+        # with conn: 隐式事务；executemany复用预编译语句批量插入
+        with conn:
+            conn.execute('DELETE FROM ip_username_history WHERE ip_address = ?', (test_ip,))
+            conn.executemany('''
+                INSERT INTO ip_username_history
                 (ip_address, username, first_used, last_used, usage_count)
                 VALUES (?, ?, ?, ?, ?)
-            ''', (test_ip, username, now.isoformat(), now.isoformat(), i + 1))
-        
-        conn.commit()
+            ''', rows)
         conn.close()
         
         print(f"已为IP {test_ip} 设置测试用户名: {test_usernames}")
@@ -4,6 +4,8 @@
 测试通过聊天室@云台指令控制云台设备的完整流程
 """
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
 import json
 import time
 import logging
@@ -31,7 +33,18 @@ class GimbalChatControlTest:
         self.base_url = base_url.rstrip('/')
         self.test_username = f"测试用户_{int(time.time())}"
         self.session = requests.Session()
-    
+
+        # keep-alive连接池（并发测试最多复用5条连接）
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=5))
+        # 会话级请求头，JSON POST不再逐次合并header字典
+        self.session.headers.update({'Content-Type': 'application/json'})
+
+        # 预热连接，首个测试请求免去TCP握手开销
+        try:
+            self.session.head(f"{self.base_url}/health", timeout=2)
+        except requests.RequestException:
+            pass
+
     def test_health_check(self) -> bool:
         """测试服务器健康状态"""
         try:
@@ -65,6 +78,34 @@ class GimbalChatControlTest:
             logger.error(f"❌ 获取MQTT状态异常: {e}")
             return {}
     
+    def _get_commands_sent(self) -> int:
+        """静默读取已发送云台指令计数（不打印状态日志）"""
+        try:
+            response = self.session.get(f"{self.base_url}/mqtt/status", timeout=2)
+            if response.status_code == 200:
+                return response.json().get('mqtt_status', {}).get('gimbal_commands_sent', 0)
+        except requests.RequestException:
+            pass
+        return 0
+
+    def _wait_for_command_ack(self, prev_count: int, timeout: float = 3.0) -> bool:
+        """
+        轮询MQTT状态直到指令计数增加（事件驱动等待，替代固定sleep）
+
+        Args:
+            prev_count: 发送前的指令计数
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            指令是否在超时前被确认
+        """
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self._get_commands_sent() > prev_count:
+                return True
+            time.sleep(0.1)
+        return False
+
     def send_gimbal_command(self, ang_x: int, ang_y: int) -> bool:
         """
         发送云台控制指令
@@ -92,10 +133,9 @@ class GimbalChatControlTest:
             
             response = self.session.post(
                 f"{self.base_url}/quick-send",
-                json=payload,
-                headers={'Content-Type': 'application/json'}
+                json=payload
             )
-            
+
             if response.status_code == 200:
                 result = response.json()
                 logger.info("✅ 消息发送成功")
@@ -125,19 +165,19 @@ class GimbalChatControlTest:
         
         for i, case in enumerate(test_cases, 1):
             logger.info(f"📋 测试案例 {i}: {case['desc']}")
-            
-            # 发送指令
+
+            # 记录发送前计数，发送后轮询确认而非固定等待
+            prev_count = self._get_commands_sent()
             success = self.send_gimbal_command(case['ang_x'], case['ang_y'])
-            
+
             if success:
-                logger.info(f"✅ 测试案例 {i} 成功")
+                if self._wait_for_command_ack(prev_count):
+                    logger.info(f"✅ 测试案例 {i} 成功（指令已确认）")
+                else:
+                    logger.warning(f"⚠️ 测试案例 {i} 发送成功但未在超时内确认")
             else:
                 logger.error(f"❌ 测试案例 {i} 失败")
-            
-            # 等待指令处理
-            logger.info("⏳ 等待3秒...")
-            time.sleep(3)
-            
+
             logger.info("-" * 30)
     
     def test_invalid_commands(self):
@@ -151,33 +191,35 @@ class GimbalChatControlTest:
             "@云台 错误的指令格式",              # 格式错误
         ]
         
-        logger.info("🧪 开始测试无效云台控制指令")
+        logger.info("🧪 开始测试无效云台控制指令（并发发送）")
         logger.info("=" * 50)
-        
-        for i, message in enumerate(invalid_cases, 1):
-            logger.info(f"📋 无效测试案例 {i}: {message}")
-            
+
+        def _send_invalid(message: str):
             payload = {
                 "username": self.test_username,
                 "message": message
             }
-            
             try:
                 response = self.session.post(
                     f"{self.base_url}/quick-send",
-                    json=payload,
-                    headers={'Content-Type': 'application/json'}
+                    json=payload
                 )
-                
-                if response.status_code == 200:
-                    logger.info("✅ 消息发送成功（应该被系统拒绝）")
-                else:
-                    logger.warning(f"⚠️ 消息发送失败: {response.status_code}")
-                
+                return message, response.status_code, None
             except Exception as e:
-                logger.error(f"❌ 发送异常: {e}")
-            
-            time.sleep(2)
+                return message, None, e
+
+        # 无效指令彼此无序依赖，并发发送，总耗时取决于最慢一条
+        with ThreadPoolExecutor(max_workers=len(invalid_cases)) as pool:
+            results = list(pool.map(_send_invalid, invalid_cases))
+
+        for i, (message, status_code, error) in enumerate(results, 1):
+            logger.info(f"📋 无效测试案例 {i}: {message}")
+            if error is not None:
+                logger.error(f"❌ 发送异常: {error}")
+            elif status_code == 200:
+                logger.info("✅ 消息发送成功（应该被系统拒绝）")
+            else:
+                logger.warning(f"⚠️ 消息发送失败: {status_code}")
             logger.info("-" * 30)
     
     def run_full_test(self):
@@ -3,15 +3,48 @@
 云台控制MQTT测试脚本
 用于测试通过MQTT发送云台控制命令
 """
-import json
+import re
 import time
 import logging
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import paho.mqtt.client as mqtt
+from paho.mqtt import publish
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _sleep_until(deadline):
+    """按绝对单调时钟截止时间休眠，发布/日志耗时计入等待而非叠加其上"""
+    time.sleep(max(0.0, deadline - time.monotonic()))
+
+
+# 模块级预编译的命令格式正则（bytes模式，回显载荷无需先解码即可匹配）
+_ANG_RE = re.compile(rb'^Ang_X=(-?\d+),Ang_Y=(-?\d+)$')
+
+# 测试用例表为运行期常量
+TEST_CASES = [
+    # 正常情况
+    {"name": "正常情况1", "x": 2036, "y": 2125},
+    {"name": "正常情况2", "x": 1024, "y": 1850},  # 最小值
+    {"name": "正常情况3", "x": 3048, "y": 2400},  # 最大值
+    {"name": "正常情况4", "x": 2000, "y": 2000},  # 中间值
+
+    # 边界情况
+    {"name": "X边界测试", "x": 1023, "y": 2000},  # X超出下限
+    {"name": "X边界测试", "x": 3049, "y": 2000},  # X超出上限
+    {"name": "Y边界测试", "x": 2000, "y": 1849},  # Y超出下限
+    {"name": "Y边界测试", "x": 2000, "y": 2401},  # Y超出上限
+]
+
+# 导入时一次性预编码命令载荷，发送路径只做指针拷贝，不再逐次拼串+编码
+PRESERIALIZED_COMMANDS = [
+    (case["name"], b'Ang_X=%d,Ang_Y=%d' % (case["x"], case["y"]))
+    for case in TEST_CASES
+]
+
 
 class GimbalControlTester:
     """云台控制测试器"""
@@ -29,6 +62,9 @@ class GimbalControlTester:
         
         # MQTT客户端
         self.client = mqtt.Client()
+        # 压测路径放开流水线：大量在途消息、发送队列不设上限
+        self.client.max_inflight_messages_set(1000)
+        self.client.max_queued_messages_set(0)
         self.client.on_connect = self._on_connect
         self.client.on_message = self._on_message
         self.client.on_disconnect = self._on_disconnect
@@ -39,17 +75,21 @@ class GimbalControlTester:
         
         # 状态
         self.is_connected = False
-        
+        # 连接建立通知事件，替代轮询等待
+        self._connected_evt = threading.Event()
+
+
     def _on_connect(self, client, userdata, flags, rc):
         """连接回调"""
         if rc == 0:
             self.is_connected = True
             logger.info("MQTT连接成功")
-            
+
             # 订阅系统消息主题以接收反馈
             client.subscribe(self.system_topic)
             logger.info(f"订阅系统消息主题: {self.system_topic}")
-            
+
+            self._connected_evt.set()
         else:
             logger.error(f"MQTT连接失败，错误代码: {rc}")
     
@@ -62,10 +102,17 @@ class GimbalControlTester:
         """消息回调"""
         try:
             topic = message.topic
-            payload = message.payload.decode('utf-8')
-            
+
+            # 命令格式回显直接用预编译正则在bytes上匹配
+            m = _ANG_RE.match(message.payload)
+            if m:
+                logger.info(f"收到命令回显: {topic} -> X={int(m.group(1))}, Y={int(m.group(2))}")
+                return
+
+            # 日志只截取前200字节惰性解码，大载荷不做整体decode
+            payload = message.payload[:200].decode('utf-8', errors='replace')
             logger.info(f"收到消息: {topic} -> {payload}")
-            
+
         except Exception as e:
             logger.error(f"处理消息异常: {e}")
     
@@ -75,15 +122,10 @@ class GimbalControlTester:
             logger.info(f"连接到MQTT代理: {self.broker_host}:{self.broker_port}")
             self.client.connect(self.broker_host, self.broker_port, 60)
             self.client.loop_start()
-            
-            # 等待连接
-            retry_count = 0
-            while not self.is_connected and retry_count < 10:
-                time.sleep(0.5)
-                retry_count += 1
-            
-            return self.is_connected
-            
+
+            # 事件通知等待，连接建立即刻返回
+            return self._connected_evt.wait(timeout=5)
+
         except Exception as e:
             logger.error(f"连接失败: {e}")
             return False
@@ -105,21 +147,44 @@ class GimbalControlTester:
         if not self.is_connected:
             logger.error("MQTT未连接")
             return False
-        
-        try:
-            # 构造命令
-            command = f"Ang_X={ang_x},Ang_Y={ang_y}"
-            
-            # 发送命令
-            self.client.publish(self.gimbal_topic, command)
-            logger.info(f"发送云台控制命令: {command}")
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"发送命令失败: {e}")
+
+        # 直接按bytes构造命令，跳过str->bytes的再编码；
+        # 发布异常向上传播，由run_test_suite/main统一处理
+        payload = b'Ang_X=%d,Ang_Y=%d' % (int(ang_x), int(ang_y))
+
+        self.client.publish(self.gimbal_topic, payload, qos=0, retain=False)
+        logger.info(f"发送云台控制命令: {payload.decode('ascii')}")
+
+        return True
+
+    def _new_client(self):
+        """创建一个带独立网络循环的发布客户端（多客户端并发压测用）"""
+        client = mqtt.Client()
+        client.max_inflight_messages_set(1000)
+        client.max_queued_messages_set(0)
+
+        connected = threading.Event()
+        client.on_connect = lambda c, userdata, flags, rc: connected.set()
+        client.connect(self.broker_host, self.broker_port, 60)
+        client.loop_start()
+        connected.wait(timeout=5)
+        return client
+
+    def send_preencoded_command(self, payload):
+        """
+        发送预编码的云台控制命令（载荷已是bytes，直接publish）
+
+        Args:
+            payload: 预先编码好的命令字节串
+        """
+        if not self.is_connected:
+            logger.error("MQTT未连接")
             return False
-    
+
+        self.client.publish(self.gimbal_topic, payload, qos=0, retain=False)
+        logger.info(f"发送云台控制命令: {payload.decode('utf-8')}")
+        return True
+
     def run_test_suite(self):
         """运行测试套件"""
         logger.info("开始云台控制测试")
@@ -130,31 +195,36 @@ class GimbalControlTester:
             return
         
         try:
+            # 绝对截止时间调度：各阶段等待不再被工作耗时拉长
+            deadline = time.monotonic() + 1.0
             # 等待一秒以确保连接稳定
-            time.sleep(1)
-            
-            # 测试用例
-            test_cases = [
-                # 正常情况
-                {"name": "正常情况1", "x": 2036, "y": 2125},
-                {"name": "正常情况2", "x": 1024, "y": 1850},  # 最小值
-                {"name": "正常情况3", "x": 3048, "y": 2400},  # 最大值
-                {"name": "正常情况4", "x": 2000, "y": 2000},  # 中间值
-                
-                # 边界情况
-                {"name": "X边界测试", "x": 1023, "y": 2000},  # X超出下限
-                {"name": "X边界测试", "x": 3049, "y": 2000},  # X超出上限
-                {"name": "Y边界测试", "x": 2000, "y": 1849},  # Y超出下限
-                {"name": "Y边界测试", "x": 2000, "y": 2401},  # Y超出上限
-            ]
-            
-            for i, case in enumerate(test_cases):
-                logger.info(f"\n=== 测试用例 {i+1}: {case['name']} ===")
-                self.send_gimbal_command(case['x'], case['y'])
-                
-                # 等待处理
-                time.sleep(2)
-            
+            _sleep_until(deadline)
+
+
+            # 多客户端并发发送：突破单socket串行化，整个用例表近RTT时间发完
+            for i, (name, _) in enumerate(PRESERIALIZED_COMMANDS):
+                logger.info(f"测试用例 {i+1}: {name}")
+
+            clients = [self._new_client() for _ in range(4)]
+            try:
+                with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+                    list(pool.map(
+                        lambda pair: pair[0].publish(
+                            self.gimbal_topic, pair[1], qos=0, retain=False),
+                        zip(itertools.cycle(clients),
+                            (payload for _, payload in PRESERIALIZED_COMMANDS))
+                    ))
+                logger.info(f"已并发发送 {len(PRESERIALIZED_COMMANDS)} 条测试命令")
+            finally:
+                for client in clients:
+                    client.loop_stop()
+                    client.disconnect()
+
+            # 等待整批处理
+            deadline += 2.0
+            _sleep_until(deadline)
+
+
             # 发送格式错误的命令测试
             logger.info("\n=== 格式错误测试 ===")
             
@@ -166,14 +236,22 @@ class GimbalControlTester:
                 "Ang_X=2036,Ang_Y=2125,Extra=123"  # 多余参数
             ]
             
-            for cmd in error_commands:
-                logger.info(f"发送错误格式命令: {cmd}")
-                self.client.publish(self.gimbal_topic, cmd)
-                time.sleep(1.5)
-            
+            # publish.multiple一次调用发整批，免去逐条publish的客户端内部加锁
+            msgs = [
+                {'topic': self.gimbal_topic, 'payload': cmd, 'qos': 0}
+                for cmd in error_commands
+            ]
+            logger.info(f"批量发送 {len(msgs)} 条错误格式命令")
+            publish.multiple(msgs, hostname=self.broker_host, port=self.broker_port)
+
+            deadline = time.monotonic() + 1.5
+            _sleep_until(deadline)
+
+
             logger.info("\n测试完成，等待5秒接收反馈...")
-            time.sleep(5)
-            
+            _sleep_until(deadline + 5.0)
+
+
         finally:
             self.disconnect()
             logger.info("测试结束")
@@ -3,18 +3,41 @@
 测试IP用户名重复使用功能的脚本
 """
 import sqlite3
+import functools
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from datetime import datetime
 
+# SQL作为模块级常量复用，同一连接上可命中sqlite3的语句缓存
+_SQL_INSERT_HISTORY = '''
+    INSERT OR REPLACE INTO ip_username_history
+    (ip_address, username, first_used, last_used, usage_count)
+    VALUES (?, ?, ?, ?, ?)
+'''
+_SQL_QUERY_HISTORY = '''
+    SELECT username, usage_count, first_used, last_used FROM ip_username_history
+    WHERE ip_address = ?
+    ORDER BY last_used DESC
+'''
+
+@functools.lru_cache(maxsize=1)
+def _db():
+    """惰性打开的模块级数据库连接，整个脚本生命周期内复用"""
+    conn = sqlite3.connect('chat_history.db')
+    # WAL+NORMAL减少fsync次数，提交更快
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn
+
 def test_database_setup():
     """测试数据库表结构是否正确"""
     print("=== 测试数据库表结构 ===")
     
     try:
-        conn = sqlite3.connect('chat_history.db')
+        conn = _db()
         cursor = conn.cursor()
-        
+
         # 检查user_sessions表是否有ip_address列
         cursor.execute("PRAGMA table_info(user_sessions)")
         columns = [col[1] for col in cursor.fetchall()]
@@ -29,8 +52,7 @@ def test_database_setup():
             cursor.execute("PRAGMA table_info(ip_username_history)")
             ip_columns = [col[1] for col in cursor.fetchall()]
             print(f"ip_username_history表的列: {ip_columns}")
-        
-        conn.close()
+
         return True
         
     except Exception as e:
@@ -42,23 +64,22 @@ def insert_test_data():
     print("\n=== 插入测试数据 ===")
     
     try:
-        conn = sqlite3.connect('chat_history.db')
+        conn = _db()
         cursor = conn.cursor()
-        
+
         test_ip = "192.168.1.100"
         test_usernames = ["张三", "李四", "王五"]
-        
-        # 插入测试的IP-用户名关联数据
-        for i, username in enumerate(test_usernames):
-            now = datetime.now()
-            cursor.execute('''
-                INSERT OR REPLACE INTO ip_username_history 
-                (ip_address, username, first_used, last_used, usage_count)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (test_ip, username, now.isoformat(), now.isoformat(), i + 1))
-        
-        conn.commit()
-        conn.close()
+
+        # 时间戳对每行相同，循环外只格式化一次
+        now_iso = datetime.now().isoformat()
+        rows = [
+            (test_ip, username, now_iso, now_iso, i + 1)
+            for i, username in enumerate(test_usernames)
+        ]
+
+        # 单事务内executemany批量插入：一次SQL解析、一次fsync
+        with conn:
+            cursor.executemany(_SQL_INSERT_HISTORY, rows)
         
         print(f"已为IP {test_ip} 插入测试用户名: {test_usernames}")
         return True
@@ -72,16 +93,20 @@ def test_api_endpoints():
     print("\n=== 测试API端点 ===")
     
     base_url = "http://localhost:5000"
-    
+
+    # 复用同一Session的连接池，多次请求免去重复TCP握手
+    session = requests.Session()
+    session.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
     try:
         # 测试主页是否可访问
-        response = requests.get(f"{base_url}/")
+        response = session.get(f"{base_url}/", timeout=5)
         print(f"主页访问状态: {response.status_code}")
-        
+
         # 测试API文档
-        response = requests.get(f"{base_url}/api/docs")
+        response = session.get(f"{base_url}/api/docs", timeout=5)
         print(f"API文档访问状态: {response.status_code}")
-        
+
         return True
         
     except Exception as e:
@@ -93,24 +118,19 @@ def query_test_data():
     print("\n=== 查询测试数据 ===")
     
     try:
-        conn = sqlite3.connect('chat_history.db')
+        conn = _db()
         cursor = conn.cursor()
-        
+
         test_ip = "192.168.1.100"
-        
+
         # 查询该IP的用户名历史
-        cursor.execute('''
-            SELECT username, usage_count, first_used, last_used FROM ip_username_history 
-            WHERE ip_address = ?
-            ORDER BY last_used DESC
-        ''', (test_ip,))
-        
+        cursor.execute(_SQL_QUERY_HISTORY, (test_ip,))
+
         results = cursor.fetchall()
         print(f"IP {test_ip} 的用户名历史:")
         for username, count, first, last in results:
             print(f"  - {username}: 使用次数={count}, 首次使用={first[:19]}, 最后使用={last[:19]}")
-        
-        conn.close()
+
         return len(results) > 0
         
     except Exception as e:
@@ -153,5 +173,9 @@ def main():
     else:
         print("⚠️ 部分测试失败，请检查实现")
 
+    # 脚本结束时关闭复用的数据库连接
+    _db().close()
+    _db.cache_clear()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,13 +3,19 @@
 MQTT测试客户端
 用于测试聊天室的MQTT集成功能
 """
-import json
+import orjson
 import time
 import threading
 import paho.mqtt.client as mqtt
+from collections import deque
 from datetime import datetime
 
 
+def _sleep_until(deadline):
+    """按绝对单调时钟截止时间休眠，发布/日志耗时计入等待而非叠加其上"""
+    time.sleep(max(0.0, deadline - time.monotonic()))
+
+
 class MQTTTestClient:
     """MQTT测试客户端"""
     
@@ -20,6 +26,9 @@ class MQTTTestClient:
         
         # 创建MQTT客户端
         self.client = mqtt.Client()
+        # 压测路径放开流水线：大量在途消息、发送队列不设上限
+        self.client.max_inflight_messages_set(1000)
+        self.client.max_queued_messages_set(0)
         self.client.on_connect = self._on_connect
         self.client.on_message = self._on_message
         self.client.on_disconnect = self._on_disconnect
@@ -34,8 +43,36 @@ class MQTTTestClient:
         }
         
         self.is_connected = False
-        self.received_messages = []
-    
+        # 有界环形缓冲：O(1)追加、内存上界固定，高速率下不触发列表扩容拷贝
+        self.received_messages = deque(maxlen=10000)
+        # 连接建立通知事件，替代轮询等待
+        self._connected_evt = threading.Event()
+        # 墙钟锚点：接收路径只取单调纳秒，ISO时间戳在读取结果时才还原
+        self._wall_anchor = time.time()
+        self._ns_anchor = time.monotonic_ns()
+        # 聊天载荷模板：发送时copy+改两个槽位，免去逐次重建dict
+        self._chat_template = {
+            'client_id': self.client_id,
+            'username': None,
+            'message': None
+        }
+
+    def _ns_to_iso(self, ts_ns):
+        """把单调纳秒时间戳还原为ISO格式墙钟时间"""
+        wall = self._wall_anchor + (ts_ns - self._ns_anchor) / 1e9
+        return datetime.fromtimestamp(wall).isoformat()
+
+    def _publish_json(self, topic_key, data):
+        """以orjson编码发布消息（C实现编码，比标准库json快且省去ensure_ascii开销）
+
+        发布到服务端实际订阅的原始主题
+        """
+        self.client.publish(
+            self.topics[topic_key],
+            orjson.dumps(data),
+            qos=0, retain=False
+        )
+
     def _on_connect(self, client, userdata, flags, rc):
         """连接回调"""
         if rc == 0:
@@ -46,6 +83,8 @@ class MQTTTestClient:
             for topic in [self.topics['chat_out'], self.topics['system']]:
                 client.subscribe(topic)
                 print(f"✓ 订阅主题: {topic}")
+
+            self._connected_evt.set()
         else:
             print(f"✗ MQTT连接失败，错误代码: {rc}")
     
@@ -58,27 +97,29 @@ class MQTTTestClient:
         """消息回调"""
         try:
             topic = message.topic
-            payload = message.payload.decode('utf-8')
-            timestamp = datetime.now().isoformat()
-            
-            print(f"📨 收到消息 [{timestamp}]")
+            # 接收热路径只记单调纳秒，不走datetime/tzinfo格式化
+            ts_ns = time.monotonic_ns()
+
+            print(f"📨 收到消息")
             print(f"   主题: {topic}")
-            print(f"   内容: {payload}")
-            
-            # 尝试解析JSON
+
+            # 解析器直接吃bytes，不预先整体decode；JSON -> 纯文本回退
             try:
-                msg_data = json.loads(payload)
-                print(f"   JSON解析: {json.dumps(msg_data, indent=2, ensure_ascii=False)}")
-            except json.JSONDecodeError:
-                print(f"   非JSON格式消息")
+                msg_data = orjson.loads(message.payload)
+                payload = orjson.dumps(msg_data).decode('utf-8')
+                print(f"   JSON解析: {orjson.dumps(msg_data, option=orjson.OPT_INDENT_2).decode('utf-8')}")
+            except orjson.JSONDecodeError:
+                # 日志只截取前200字节惰性解码，大载荷不做整体decode
+                payload = message.payload[:200].decode('utf-8', errors='replace')
+                print(f"   非JSON格式消息: {payload}")
             
             print("-" * 60)
             
-            # 记录消息
+            # 记录消息（时间戳存原始纳秒，读取时再格式化）
             self.received_messages.append({
                 'topic': topic,
                 'payload': payload,
-                'timestamp': timestamp
+                'timestamp_ns': ts_ns
             })
             
         except Exception as e:
@@ -90,14 +131,9 @@ class MQTTTestClient:
             print(f"🔌 正在连接到MQTT代理: {self.broker_host}:{self.broker_port}")
             self.client.connect(self.broker_host, self.broker_port, 60)
             self.client.loop_start()
-            
-            # 等待连接建立
-            retry_count = 0
-            while not self.is_connected and retry_count < 20:
-                time.sleep(0.5)
-                retry_count += 1
-            
-            if self.is_connected:
+
+            # 事件通知等待，连接建立即刻返回
+            if self._connected_evt.wait(timeout=10):
                 return True
             else:
                 print(f"✗ MQTT连接超时")
@@ -121,73 +157,81 @@ class MQTTTestClient:
             print(f"✗ 断开连接异常: {e}")
     
     def send_user_join(self, username="MQTT测试用户"):
-        """发送用户加入消息"""
-        try:
-            if not self.is_connected:
-                print("✗ MQTT未连接，无法发送消息")
-                return False
-            
-            join_data = {
-                'client_id': self.client_id,
-                'username': username
-            }
-            
-            self.client.publish(
-                self.topics['user_join'], 
-                json.dumps(join_data, ensure_ascii=False)
-            )
-            print(f"📤 发送用户加入消息: {username}")
-            return True
-        except Exception as e:
-            print(f"✗ 发送用户加入消息失败: {e}")
+        """发送用户加入消息（发布异常向上传播给调用方统一处理）"""
+        if not self.is_connected:
+            print("✗ MQTT未连接，无法发送消息")
             return False
-    
+
+        join_data = {
+            'client_id': self.client_id,
+            'username': username
+        }
+
+        self._publish_json('user_join', join_data)
+        print(f"📤 发送用户加入消息: {username}")
+        return True
+
     def send_user_leave(self):
         """发送用户离开消息"""
-        try:
-            if not self.is_connected:
-                return False
-            
-            leave_data = {
-                'client_id': self.client_id
-            }
-            
-            self.client.publish(
-                self.topics['user_leave'], 
-                json.dumps(leave_data, ensure_ascii=False)
-            )
-            print(f"📤 发送用户离开消息")
-            return True
-        except Exception as e:
-            print(f"✗ 发送用户离开消息失败: {e}")
+        if not self.is_connected:
             return False
-    
+
+        leave_data = {
+            'client_id': self.client_id
+        }
+
+        self._publish_json('user_leave', leave_data)
+        print(f"📤 发送用户离开消息")
+        return True
+
     def send_chat_message(self, username="MQTT测试用户", message="Hello from MQTT!"):
         """发送聊天消息"""
-        try:
-            if not self.is_connected:
-                print("✗ MQTT未连接，无法发送消息")
-                return False
-            
-            chat_data = {
-                'client_id': self.client_id,
-                'username': username,
-                'message': message
-            }
-            
-            self.client.publish(
-                self.topics['chat_in'], 
-                json.dumps(chat_data, ensure_ascii=False)
-            )
-            print(f"📤 发送聊天消息: {username} -> {message}")
-            return True
-        except Exception as e:
-            print(f"✗ 发送聊天消息失败: {e}")
+        if not self.is_connected:
+            print("✗ MQTT未连接，无法发送消息")
             return False
-    
+
+        chat_data = self._chat_template.copy()
+        chat_data['username'] = username
+        chat_data['message'] = message
+
+        self._publish_json('chat_in', chat_data)
+        print(f"📤 发送聊天消息: {username} -> {message}")
+        return True
+
+    def send_chat_messages_bulk(self, username, messages):
+        """批量发送聊天消息：载荷先全部编码好，再背靠背publish
+
+        不做逐条日志和逐条sleep，由paho内部队列负责pacing
+        """
+        if not self.is_connected:
+            print("✗ MQTT未连接，无法发送消息")
+            return False
+
+        template = self._chat_template.copy()
+        template['username'] = username
+        preblobs = []
+        for m in messages:
+            template['message'] = m
+            preblobs.append(orjson.dumps(template))
+
+        topic = self.topics['chat_in']
+        for blob in preblobs:
+            # QoS 0 fire-and-forget，写线程不等PUBACK即可流水线发送
+            self.client.publish(topic, blob, qos=0, retain=False)
+
+        print(f"📤 批量发送聊天消息: {username} -> {len(preblobs)} 条")
+        return True
+
     def get_received_messages(self):
-        """获取接收到的消息列表"""
-        return self.received_messages.copy()
+        """获取接收到的消息列表（此处才把纳秒时间戳格式化为ISO字符串）"""
+        return [
+            {
+                'topic': msg['topic'],
+                'payload': msg['payload'],
+                'timestamp': self._ns_to_iso(msg['timestamp_ns'])
+            }
+            for msg in self.received_messages
+        ]
 
 
 def test_mqtt_integration():
@@ -204,10 +248,15 @@ def test_mqtt_integration():
             print("✗ 测试失败：无法连接到MQTT代理")
             return False
         
+        # 绝对截止时间调度：各阶段等待不随工作耗时漂移
+        deadline = time.monotonic()
+
         # 发送用户加入消息
         test_client.send_user_join("MQTT测试用户")
-        time.sleep(1)
-        
+        deadline += 1.0
+        _sleep_until(deadline)
+
+
         # 发送聊天消息
         test_messages = [
             "Hello from MQTT client!",
@@ -216,13 +265,13 @@ def test_mqtt_integration():
             "最后一条测试消息"
         ]
         
-        for msg in test_messages:
-            test_client.send_chat_message("MQTT测试用户", msg)
-            time.sleep(2)  # 等待处理
-        
+        test_client.send_chat_messages_bulk("MQTT测试用户", test_messages)
+
+
         # 等待接收回复
         print("⏳ 等待接收消息...")
-        time.sleep(5)
+        deadline += 5.0
+        _sleep_until(deadline)
         
         # 检查接收到的消息
         received = test_client.get_received_messages()
@@ -239,8 +288,10 @@ def test_mqtt_integration():
         
         # 发送用户离开消息
         test_client.send_user_leave()
-        time.sleep(1)
-        
+        deadline += 1.0
+        _sleep_until(deadline)
+
+
         return True
         
     except Exception as e:
@@ -3,12 +3,11 @@
 简单的WebSocket客户端测试脚本
 用于测试AI聊天室的WebSocket功能
 """
+import asyncio
 import socketio
-import time
-import threading
 
-# 创建Socket.IO客户端
-sio = socketio.Client()
+# 创建异步Socket.IO客户端：发送/接收在同一事件循环内重叠，无需发送线程
+sio = socketio.AsyncClient()
 
 # 测试数据
 test_username = "TestUser"
@@ -19,80 +18,98 @@ test_messages = [
     "Another test message"
 ]
 
+# 消息回执计数事件：收齐N条message_sent/message_error即放行，替代固定sleep
+_ack_count = 0
+all_acked = asyncio.Event()
+
+def _record_ack():
+    global _ack_count
+    _ack_count += 1
+    if _ack_count >= len(test_messages):
+        all_acked.set()
+
 @sio.event
-def connect():
+async def connect():
     print("✅ Connected to WebSocket server")
-    
+
     # 发送加入聊天室请求
     print(f"🚀 Joining chat room as {test_username}")
-    sio.emit('join_room', {'username': test_username})
+    await sio.emit('join_room', {'username': test_username})
 
 @sio.event
-def connect_success(data):
+async def connect_success(data):
     print(f"✅ Connection success: {data}")
 
 @sio.event
-def join_room_success(data):
+async def join_room_success(data):
     print(f"✅ Joined chat room successfully: {data['message']}")
     print(f"📝 Chat history: {len(data['chat_history'])} messages")
     print(f"👥 Online users: {len(data['online_users'])} users")
-    
-    # 开始发送测试消息
-    threading.Thread(target=send_test_messages, daemon=True).start()
+
+    # 开始发送测试消息（同一事件循环内并发，不再另起线程）
+    asyncio.create_task(send_test_messages())
 
 @sio.event
-def join_room_error(data):
+async def join_room_error(data):
     print(f"❌ Failed to join room: {data['error']}")
+    all_acked.set()
 
 @sio.event
-def message_sent(data):
+async def message_sent(data):
     print(f"✅ Message sent successfully: {data['message']}")
+    _record_ack()
 
 @sio.event
-def message_error(data):
+async def message_error(data):
     print(f"❌ Message send failed: {data['error']}")
+    _record_ack()
 
 @sio.event
-def broadcast_message(data):
+async def broadcast_message(data):
     print(f"📨 Received broadcast: {data.get('type', 'unknown')} - {data}")
 
 @sio.event
-def disconnect():
+async def disconnect():
     print("❌ Disconnected from WebSocket server")
 
 @sio.event
-def connect_error(data):
+async def connect_error(data):
     print(f"❌ Connection error: {data}")
 
-def send_test_messages():
-    """发送测试消息"""
-    time.sleep(2)  # 等待连接稳定
-    
-    for i, message in enumerate(test_messages):
-        print(f"📤 Sending message {i+1}: {message}")
+async def send_test_messages():
+    """批量发送测试消息，然后等待整批回执"""
+    # 一次提交全部emit，由事件循环合并写出
+    await asyncio.gather(*[
         sio.emit('send_message', {'message': message})
-        time.sleep(3)  # 等待响应
-    
-    # 测试完成，等待一下然后断开
-    time.sleep(5)
+        for message in test_messages
+    ])
+    print(f"📤 Sent {len(test_messages)} messages, awaiting acks...")
+
+    try:
+        await asyncio.wait_for(all_acked.wait(), timeout=10)
+    except asyncio.TimeoutError:
+        print(f"⚠️ Only {_ack_count}/{len(test_messages)} messages acknowledged")
+
+    # 留短暂窗口接收尾部广播后断开
+    await asyncio.sleep(1)
     print("🔄 Test completed, disconnecting...")
-    sio.disconnect()
+    await sio.disconnect()
 
-def main():
+async def main():
     """主函数"""
     print("🚀 Starting WebSocket test...")
-    
+
     try:
         # 连接到服务器
-        sio.connect('http://localhost:5000', transports=['websocket'])
-        
+        await sio.connect('http://localhost:5000', transports=['websocket'])
+
         # 等待测试完成
-        sio.wait()
-        
+        await sio.wait()
+
     except Exception as e:
         print(f"❌ Test failed: {e}")
-    
+
     print("✨ Test finished!")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    asyncio.run(main())
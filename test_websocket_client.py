@@ -2,73 +2,86 @@
 """
 测试WebSocket客户端 - 模拟前端加入聊天室的过程
 """
-import socketio
-import time
 import asyncio
+import socketio
+
+# 创建异步Socket.IO客户端：事件处理与发送共用一个事件循环
+sio = socketio.AsyncClient()
 
-# 创建Socket.IO客户端
-sio = socketio.Client()
+# 测试流程结束事件：第二条消息（AI对话）回执或任一错误到达即放行
+test_done = asyncio.Event()
+_sent_count = 0
 
 @sio.event
-def connect():
+async def connect():
     print('✅ 连接成功！')
     print('🚀 发送加入聊天室请求...')
-    sio.emit('join_room', {'username': '测试用户123'})
+    await sio.emit('join_room', {'username': '测试用户123'})
 
-@sio.event  
-def disconnect():
+@sio.event
+async def disconnect():
     print('❌ 连接断开')
 
 @sio.on('join_room_success')
-def on_join_success(data):
+async def on_join_success(data):
     print(f'🎉 加入聊天室成功！')
     print(f'   用户: {data.get("user", {}).get("username", "未知")}')
     print(f'   会话ID: {data.get("session_id", "未知")}')
     print(f'   在线用户数: {len(data.get("online_users", []))}')
     print(f'   聊天历史数量: {len(data.get("chat_history", []))}')
-    
+
     # 测试发送消息
     print('💬 发送测试消息...')
-    sio.emit('send_message', {'message': '你好，这是一条测试消息！'})
+    await sio.emit('send_message', {'message': '你好，这是一条测试消息！'})
 
 @sio.on('join_room_error')
-def on_join_error(data):
+async def on_join_error(data):
     print(f'❌ 加入聊天室失败: {data.get("error", "未知错误")}')
+    test_done.set()
 
 @sio.on('message_sent')
-def on_message_sent(data):
+async def on_message_sent(data):
+    global _sent_count
     print(f'📨 消息发送成功!')
     print(f'   消息内容: {data.get("message_data", {}).get("content", "未知")}')
-    
-    # 测试AI对话
-    print('🤖 测试AI对话...')
-    sio.emit('send_message', {'message': '@AI 你好，请介绍一下你自己'})
+
+    _sent_count += 1
+    if _sent_count == 1:
+        # 测试AI对话
+        print('🤖 测试AI对话...')
+        await sio.emit('send_message', {'message': '@AI 你好，请介绍一下你自己'})
+    else:
+        test_done.set()
 
 @sio.on('message_error')
-def on_message_error(data):
+async def on_message_error(data):
     print(f'❌ 消息发送失败: {data.get("error", "未知错误")}')
+    test_done.set()
 
 @sio.on('error')
-def on_error(data):
+async def on_error(data):
     print(f'💥 Socket错误: {data}')
 
-def test_websocket():
+async def test_websocket():
     try:
         print('🔌 正在连接到WebSocket服务器...')
-        sio.connect('http://localhost:5000')
-        
-        # 等待事件处理
+        await sio.connect('http://localhost:5000')
+
+        # 事件驱动等待：流程结束立即返回，最长10秒兜底
         print('⏳ 等待事件处理...')
-        time.sleep(10)  # 等待10秒处理各种事件
-        
+        try:
+            await asyncio.wait_for(test_done.wait(), timeout=10)
+        except asyncio.TimeoutError:
+            print('⚠️ 测试流程未在超时内完成')
+
     except Exception as e:
         print(f'💥 连接失败: {e}')
     finally:
         try:
-            sio.disconnect()
+            await sio.disconnect()
             print('👋 测试完成，断开连接')
-        except:
+        except Exception:
             pass
 
 if __name__ == '__main__':
-    test_websocket()
\ No newline at end of file
+    asyncio.run(test_websocket())
@@ -2,83 +2,104 @@
 """
 测试WebSocket IP用户名重复使用功能
 """
+import asyncio
 import socketio
-import time
-import json
-from threading import Event
+import logging
+import orjson
 
-# 创建Socket.IO客户端
-sio = socketio.Client()
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def _pretty(data):
+    """orjson缩进序列化（C实现，默认UTF-8非ASCII安全）"""
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode('utf-8')
+
+def _log_event(label, data):
+    """事件日志：仅在DEBUG级别才做缩进序列化，回调不被格式化阻塞"""
+    if logger.isEnabledFor(logging.DEBUG):
+        print(f"{label}: {_pretty(data)}")
+    else:
+        print(label)
+
+# 创建异步Socket.IO客户端
+sio = socketio.AsyncClient()
 
 # 用于同步的事件
-suggestion_received = Event()
-join_received = Event()
+suggestion_received = asyncio.Event()
+join_received = asyncio.Event()
 suggestion_data = None
 join_data = None
 
-@sio.on('connect')
-def on_connect():
+@sio.event
+async def connect():
     print("✅ 已连接到服务器")
 
-@sio.on('disconnect')
-def on_disconnect():
+@sio.event
+async def disconnect():
     print("❌ 已断开与服务器的连接")
 
 @sio.on('username_suggestions')
-def on_username_suggestions(data):
+async def on_username_suggestions(data):
     global suggestion_data
     suggestion_data = data
-    print(f"✅ 收到用户名建议: {json.dumps(data, indent=2, ensure_ascii=False)}")
+    _log_event("✅ 收到用户名建议", data)
     suggestion_received.set()
 
 @sio.on('username_suggestions_error')
-def on_username_suggestions_error(data):
+async def on_username_suggestions_error(data):
     global suggestion_data
     suggestion_data = data
-    print(f"❌ 用户名建议错误: {json.dumps(data, indent=2, ensure_ascii=False)}")
+    _log_event("❌ 用户名建议错误", data)
     suggestion_received.set()
 
 @sio.on('join_room_result')
-def on_join_room_result(data):
+async def on_join_room_result(data):
     global join_data
     join_data = data
-    print(f"✅ 加入房间结果: {json.dumps(data, indent=2, ensure_ascii=False)}")
+    _log_event("✅ 加入房间结果", data)
     join_received.set()
 
 @sio.on('error')
-def on_error(data):
-    print(f"❌ 收到错误: {json.dumps(data, indent=2, ensure_ascii=False)}")
+async def on_error(data):
+    _log_event("❌ 收到错误", data)
 
-def test_websocket_functionality():
+async def _wait(evt, timeout):
+    """等待事件触发，超时返回False"""
+    try:
+        await asyncio.wait_for(evt.wait(), timeout=timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+async def test_websocket_functionality():
     """测试WebSocket用户名建议功能"""
     print("=== 测试WebSocket功能 ===")
-    
+
     try:
         # 连接到服务器
         print("正在连接到服务器...")
-        sio.connect('http://localhost:5000')
-        time.sleep(1)
-        
+        await sio.connect('http://localhost:5000')
+
         # 请求用户名建议
         print("\n1. 请求用户名建议...")
-        sio.emit('get_username_suggestions')
-        
+        await sio.emit('get_username_suggestions')
+
         # 等待响应
-        if suggestion_received.wait(timeout=5):
+        if await _wait(suggestion_received, 5):
             if suggestion_data and suggestion_data.get('success'):
                 suggestions = suggestion_data.get('data', {}).get('suggestions', {})
                 print(f"获得建议: {suggestions}")
-                
+
                 if suggestions.get('has_history') and suggestions.get('available_usernames'):
                     suggested_username = suggestions['available_usernames'][0]
                     print(f"建议使用用户名: {suggested_username}")
-                    
+
                     # 使用建议的用户名加入聊天室
                     print(f"\n2. 使用建议用户名 '{suggested_username}' 加入聊天室...")
-                    sio.emit('join_room', {'username': suggested_username})
-                    
+                    await sio.emit('join_room', {'username': suggested_username})
+
                     # 等待加入结果
-                    if join_received.wait(timeout=5):
+                    if await _wait(join_received, 5):
                         if join_data and join_data.get('success'):
                             print("✅ 成功使用建议用户名加入聊天室")
                             return True
@@ -93,30 +114,30 @@ def test_websocket_functionality():
                 print("❌ 获取用户名建议失败")
         else:
             print("❌ 获取用户名建议超时")
-        
+
         return False
-        
+
     except Exception as e:
         print(f"WebSocket测试失败: {e}")
         return False
     finally:
         # 断开连接
         if sio.connected:
-            sio.disconnect()
+            await sio.disconnect()
 
-def main():
+async def main():
     """主测试函数"""
     print("开始测试WebSocket IP用户名重复使用功能...\n")
-    
-    success = test_websocket_functionality()
-    
+
+    success = await test_websocket_functionality()
+
     print("\n=== 测试总结 ===")
     if success:
         print("🎉 WebSocket IP用户名重复使用功能测试通过！")
     else:
         print("❌ WebSocket测试失败")
-    
+
     return success
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
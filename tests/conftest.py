@@ -0,0 +1,35 @@
+"""
+pytest共享fixture
+"""
+import time
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def no_ai_sleep(monkeypatch):
+    """把AI客户端模块内的重试/模拟延迟sleep替换为空操作
+
+    只替换services.ai_client里的time引用，全局time.sleep不受影响，
+    并发压力测试里刻意让出GIL的sleep仍然生效
+    """
+    monkeypatch.setattr(
+        "services.ai_client.time",
+        SimpleNamespace(time=time.time, sleep=lambda *args, **kwargs: None)
+    )
+
+
+@pytest.fixture
+def preserved_ai_singleton():
+    """测试后把全局AI客户端单例还原为重置前的实例
+
+    重置类测试不会让同进程的后续测试重新付出OpenAI客户端冷启动成本
+    """
+    from services.ai_client import AIClientManager
+
+    manager = AIClientManager._instance
+    saved_client = manager.ai_client if manager is not None else None
+    yield
+    if manager is not None and saved_client is not None:
+        manager.ai_client = saved_client
@@ -4,6 +4,7 @@ AI客户端组件单元测试
 import pytest
 import os
 import time
+from types import SimpleNamespace
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime
 
@@ -12,14 +13,39 @@ from services.ai_client import (
 )
 from models.message import create_user_message, Message
 
+# 模块级预构建的API成功响应桩：属性访问走C层，免去每次测试搭Mock属性链
+_FAKE_RESPONSE = SimpleNamespace(
+    choices=[SimpleNamespace(message=SimpleNamespace(content="AI的回复"))],
+    usage=SimpleNamespace(total_tokens=50)
+)
+
+
+@pytest.fixture(autouse=True)
+def _no_sleep(no_ai_sleep):
+    """本模块高频调用AI客户端，统一免除其重试/模拟延迟"""
+
+
+@pytest.fixture(scope="class")
+def mock_ai_client():
+    """类作用域的模拟AI客户端：构造一次，整类测试复用"""
+    return MockAIClient()
+
+
+@pytest.fixture(scope="class")
+def response_handler(mock_ai_client):
+    """类作用域的AI响应处理器，绑定共享的模拟客户端"""
+    return AIResponseHandler(mock_ai_client)
+
 
 class TestMockAIClient:
     """模拟AI客户端测试类"""
-    
-    def setup_method(self):
-        """每个测试方法前的设置"""
-        self.ai_client = MockAIClient()
-    
+
+    @pytest.fixture(autouse=True)
+    def _reset(self, mock_ai_client):
+        """每个测试前重置共享客户端的统计"""
+        mock_ai_client.reset_stats()
+        self.ai_client = mock_ai_client
+
     def test_mock_client_initialization(self):
         """测试模拟客户端初始化"""
         assert self.ai_client.is_available() is True
@@ -152,18 +178,12 @@ class TestAIClient:
         assert len(prompt) > 0
         assert "AI助手" in prompt or "友好" in prompt
     
-    @patch('time.sleep')  # 模拟sleep以加速测试
-    def test_call_api_with_retry_success(self, mock_sleep):
+    def test_call_api_with_retry_success(self):
         """测试API调用成功"""
-        # 模拟成功的API响应
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[0].message.content = "AI的回复"
-        mock_response.usage = Mock()
-        mock_response.usage.total_tokens = 50
-        
-        self.mock_openai_client.chat.completions.create.return_value = mock_response
-        
+        # 复用模块级预构建的成功响应桩
+        self.mock_openai_client.chat.completions.create.return_value = _FAKE_RESPONSE
+
+
         messages = [{"role": "user", "content": "测试消息"}]
         success, response = self.ai_client._call_api_with_retry(messages)
         
@@ -171,8 +191,7 @@ class TestAIClient:
         assert response == "AI的回复"
         assert self.ai_client.stats['total_tokens_used'] == 50
     
-    @patch('time.sleep')
-    def test_call_api_with_retry_failure(self, mock_sleep):
+    def test_call_api_with_retry_failure(self):
         """测试API调用失败后重试"""
         # 模拟API调用失败
         self.mock_openai_client.chat.completions.create.side_effect = Exception("API错误")
@@ -186,23 +205,21 @@ class TestAIClient:
         # 应该重试指定次数
         assert self.mock_openai_client.chat.completions.create.call_count == self.ai_client.max_retries
     
-    def test_handle_api_error(self):
+    @pytest.mark.parametrize("error,expected_keyword", [
+        (Exception("timeout"), "超时"),
+        (Exception("rate limit exceeded"), "繁忙"),
+        (Exception("authentication failed"), "配置错误"),
+        (Exception("network error"), "网络"),
+        (Exception("invalid request"), "格式有误"),
+        (Exception("unknown error"), "不可用")
+    ])
+    def test_handle_api_error(self, error, expected_keyword):
         """测试API错误处理"""
-        test_cases = [
-            (Exception("timeout"), "超时"),
-            (Exception("rate limit exceeded"), "繁忙"),
-            (Exception("authentication failed"), "配置错误"),
-            (Exception("network error"), "网络"),
-            (Exception("invalid request"), "格式有误"),
-            (Exception("unknown error"), "不可用")
-        ]
-        
-        for error, expected_keyword in test_cases:
-            result = self.ai_client.handle_api_error(error)
-            assert isinstance(result, str)
-            assert len(result) > 0
-            # 检查是否包含预期的关键词（不区分大小写）
-            assert any(keyword in result for keyword in [expected_keyword, "AI", "服务"])
+        result = self.ai_client.handle_api_error(error)
+        assert isinstance(result, str)
+        assert len(result) > 0
+        # 检查是否包含预期的关键词（不区分大小写）
+        assert any(keyword in result for keyword in [expected_keyword, "AI", "服务"])
     
     def test_get_ai_response_empty_message(self):
         """测试空消息处理"""
@@ -233,17 +250,9 @@ class TestAIClient:
         assert message.message_type == "ai"
     
     def test_get_stats(self):
-        """测试获取统计信息"""
+        """测试获取统计信息（字段完整性由test_ai_stats_contract覆盖）"""
         stats = self.ai_client.get_stats()
-        
-        required_keys = [
-            'total_requests', 'successful_requests', 'failed_requests',
-            'total_tokens_used', 'success_rate', 'model', 'base_url', 'is_available'
-        ]
-        
-        for key in required_keys:
-            assert key in stats
-        
+
         assert stats['model'] == "test-model"
         assert stats['base_url'] == "https://test.api.com"
         assert stats['is_available'] is True
@@ -307,8 +316,8 @@ class TestAIClientManager:
         assert client1 is client2
         assert isinstance(client1, AIClient)
     
-    def test_reset_ai_client(self):
-        """测试重置AI客户端"""
+    def test_reset_ai_client(self, preserved_ai_singleton):
+        """测试重置AI客户端（结束后还原原单例，避免拖慢后续测试）"""
         manager = AIClientManager()
         original_client = manager.get_ai_client()
         
@@ -324,12 +333,14 @@ class TestAIClientManager:
 
 class TestAIResponseHandler:
     """AI响应处理器测试类"""
-    
-    def setup_method(self):
-        """每个测试方法前的设置"""
-        self.ai_client = MockAIClient()
-        self.response_handler = AIResponseHandler(self.ai_client)
-    
+
+    @pytest.fixture(autouse=True)
+    def _reset(self, mock_ai_client, response_handler):
+        """每个测试前重置共享客户端统计并绑定处理器"""
+        mock_ai_client.reset_stats()
+        self.ai_client = mock_ai_client
+        self.response_handler = response_handler
+
     def test_handle_ai_mention_success(self):
         """测试处理AI提及成功"""
         # 创建包含AI提及的消息
@@ -415,12 +426,14 @@ class TestAIResponseHandler:
 
 class TestAIClientIntegration:
     """AI客户端集成测试"""
-    
-    def setup_method(self):
-        """每个测试方法前的设置"""
-        self.ai_client = MockAIClient()
-        self.response_handler = AIResponseHandler(self.ai_client)
-    
+
+    @pytest.fixture(autouse=True)
+    def _reset(self, mock_ai_client, response_handler):
+        """每个测试前重置共享客户端统计并绑定处理器"""
+        mock_ai_client.reset_stats()
+        self.ai_client = mock_ai_client
+        self.response_handler = response_handler
+
     def test_complete_ai_interaction_flow(self):
         """测试完整的AI交互流程"""
         # 1. 创建用户消息
@@ -0,0 +1,37 @@
+"""
+AI客户端统计信息结构契约测试
+
+汇总原先分散在test_ai_client/test_api_integration/test_api_key_validation
+中的统计字段检查：每个字段一个测试节点，模拟与真实客户端各验证一遍
+"""
+import pytest
+
+from services.ai_client import AIClient, MockAIClient
+
+# 统计信息必须包含的全部字段（三处重复列表的并集，只定义一次）
+ALL_STAT_KEYS = [
+    'total_requests',
+    'successful_requests',
+    'failed_requests',
+    'total_tokens_used',
+    'last_request_time',
+    'average_response_time',
+    'success_rate',
+    'model',
+    'base_url',
+    'is_available',
+]
+
+
+@pytest.fixture(scope="module", params=["mock", "real"])
+def stats_client(request):
+    """被检查统计契约的客户端：模块级构造一次"""
+    if request.param == "mock":
+        return MockAIClient()
+    return AIClient()
+
+
+@pytest.mark.parametrize("key", ALL_STAT_KEYS)
+def test_stats_contains_key(stats_client, key):
+    """统计信息应包含契约字段"""
+    assert key in stats_client.get_stats()
@@ -7,6 +7,7 @@ API集成测试
 import unittest
 import os
 import time
+import pytest
 from services.ai_client import AIClient, get_ai_client
 
 
@@ -30,6 +31,7 @@ class TestAPIIntegration(unittest.TestCase):
         self.assertTrue(self.client.api_key.startswith('sk-'), 
                        "API密钥格式应该正确")
     
+    @pytest.mark.network
     @unittest.skipIf(not os.getenv('MOONSHOT_API_KEY'), "需要有效的API密钥")
     def test_simple_ai_response(self):
         """测试简单的AI响应"""
@@ -45,6 +47,7 @@ class TestAPIIntegration(unittest.TestCase):
             # 即使失败，也验证错误处理是否正确
             self.assertIsInstance(response, str, "错误响应应该是字符串")
     
+    @pytest.mark.network
     @unittest.skipIf(not os.getenv('MOONSHOT_API_KEY'), "需要有效的API密钥")
     def test_ai_mention_response(self):
         """测试@AI提及功能"""
@@ -58,6 +61,7 @@ class TestAPIIntegration(unittest.TestCase):
         else:
             print(f"⚠️ AI提及测试失败: {response}")
     
+    @pytest.mark.usefixtures("no_ai_sleep")
     def test_stats_tracking(self):
         """测试统计信息跟踪"""
         initial_stats = self.client.get_stats()
@@ -73,18 +77,9 @@ class TestAPIIntegration(unittest.TestCase):
                               "请求计数应该增加")
     
     def test_connection_status(self):
-        """测试连接状态"""
+        """测试连接状态（字段完整性由test_ai_stats_contract覆盖）"""
         stats = self.client.get_stats()
-        
-        # 验证基本统计结构
-        required_fields = [
-            'total_requests', 'successful_requests', 'failed_requests',
-            'success_rate', 'is_available'
-        ]
-        
-        for field in required_fields:
-            self.assertIn(field, stats, f"统计信息应包含 {field}")
-        
+
         print(f"📊 客户端统计信息:")
         for key, value in stats.items():
             print(f"   {key}: {value}")
@@ -235,6 +235,23 @@ class TestBroadcastManager:
         assert result['success'] is True
         assert result['target_count'] == 1  # 只有room2的用户
     
+    def test_resubscribe_switches_room(self):
+        """测试重复订阅切换房间后广播到达新房间"""
+        # 同一Socket先后订阅两个房间
+        self.broadcast_manager.subscribe("socket_1", "用户1", "room1")
+        self.broadcast_manager.subscribe("socket_2", "用户2", "room1")
+        self.broadcast_manager.subscribe("socket_1", "用户1", "room2")
+
+        # 新房间能收到广播
+        message = create_user_message("用户1", "room2的消息")
+        result = self.broadcast_manager.broadcast_message(message, room="room2")
+        assert result['target_count'] == 1
+
+        # 旧房间不再包含该Socket
+        message = create_user_message("用户2", "room1的消息")
+        result = self.broadcast_manager.broadcast_message(message, room="room1")
+        assert result['target_count'] == 1
+
     def test_broadcast_with_exclude_sockets(self):
         """测试排除特定Socket的广播"""
         # 添加订阅者